@@ -7,15 +7,81 @@ import sys
 import json
 import subprocess
 import argparse
+import time
+import urllib.error
+import urllib.request
 from pathlib import Path
 
-try:
-    import requests
-except ImportError:
-    print("Error: 'requests' library not found.")
-    print("Installing requests...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "requests"])
-    import requests
+
+# GitHub API retry settings: up to MAX_RETRIES retries with 1, 2, 4s backoff
+MAX_RETRIES = 3
+# Only these methods are retried after a 5xx or a dropped connection; a non-idempotent
+# POST may already have taken effect, so it is retried on rate limits only
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+MAX_RETRY_DELAY = 60
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+API_TIMEOUT = 10
+
+
+def _is_rate_limited(error):
+    """Check if an HTTP error is a GitHub rate-limit rejection"""
+    if error.code == 429:
+        return True
+    return error.code == 403 and error.headers.get("X-RateLimit-Remaining") == "0"
+
+
+def _retry_delay(error, attempt):
+    """Seconds to wait before retrying, honoring Retry-After / X-RateLimit-Reset"""
+    delay = 2 ** attempt
+    retry_after = error.headers.get("Retry-After", "")
+    reset = error.headers.get("X-RateLimit-Reset", "")
+    if retry_after.isdigit():
+        delay = max(delay, int(retry_after))
+    elif reset.isdigit():
+        delay = max(delay, int(reset) - time.time())
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def _api(method, url, token, body=None):
+    """
+    Send a GitHub API request and return the decoded JSON response.
+    Rate limits are retried with exponential backoff, as are connection errors,
+    timeouts and 5xx responses for idempotent methods; other errors are raised.
+    """
+    idempotent = method in IDEMPOTENT_METHODS
+    headers = {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+    data = None
+    if body is not None:
+        data = json.dumps(body).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+    
+    for attempt in range(MAX_RETRIES + 1):
+        request = urllib.request.Request(url, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=API_TIMEOUT) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            retryable = _is_rate_limited(e) or (idempotent and e.code in RETRY_STATUS_CODES)
+            if attempt == MAX_RETRIES or not retryable:
+                raise
+            delay = _retry_delay(e, attempt)
+            print(f"Warning: GitHub API returned {e.code} - retrying in {delay:.0f}s...")
+        except (urllib.error.URLError, TimeoutError) as e:
+            if attempt == MAX_RETRIES or not idempotent:
+                raise
+            delay = 2 ** attempt
+            print(f"Warning: {getattr(e, 'reason', e)} - retrying in {delay}s...")
+        time.sleep(delay)
+
+
+def _error_body(error):
+    """Read the response body of an HTTP error, if any"""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.read().decode("utf-8", errors="replace")
+    return ""
 
 
 def get_github_token(token_arg=None):
@@ -54,31 +120,8 @@ def get_github_token(token_arg=None):
     return token
 
 
-def get_github_username(token):
-    """Get GitHub username from API"""
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    
-    try:
-        response = requests.get("https://api.github.com/user", headers=headers)
-        response.raise_for_status()
-        return response.json()["login"]
-    except requests.exceptions.RequestException as e:
-        print(f"Error: Failed to authenticate with GitHub API: {e}")
-        if hasattr(e.response, 'text'):
-            print(f"Response: {e.response.text}")
-        sys.exit(1)
-
-
 def create_repo(token, repo_name, is_private=False):
     """Create a GitHub repository using the API"""
-    headers = {
-        "Authorization": f"token {token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-    
     data = {
         "name": repo_name,
         "description": "USABO Test UI - Interactive web-based test application for USABO exams",
@@ -89,32 +132,30 @@ def create_repo(token, repo_name, is_private=False):
     print(f"\nCreating repository '{repo_name}' on GitHub...")
     
     try:
-        response = requests.post(
-            "https://api.github.com/user/repos",
-            headers=headers,
-            json=data
-        )
-        response.raise_for_status()
-        
-        repo_data = response.json()
+        repo_data = _api("POST", "https://api.github.com/user/repos", token, data)
         repo_url = repo_data["clone_url"]
         repo_html_url = repo_data["html_url"]
         
+        print(f"✓ Authenticated as: {repo_data['owner']['login']}")
         print(f"✓ Repository created successfully!")
         print(f"  URL: {repo_html_url}")
         print(f"  Clone URL: {repo_url}")
         
         return repo_url, repo_html_url
         
-    except requests.exceptions.RequestException as e:
+    except (urllib.error.URLError, TimeoutError) as e:
         print(f"Error: Failed to create repository: {e}")
-        if hasattr(e, 'response') and e.response is not None:
-            error_data = e.response.json() if e.response.text else {}
+        response_text = _error_body(e)
+        if response_text:
+            try:
+                error_data = json.loads(response_text)
+            except ValueError:
+                error_data = {}
             if "message" in error_data:
                 print(f"  Message: {error_data['message']}")
             if "errors" in error_data:
                 print(f"  Errors: {error_data['errors']}")
-            print(f"  Response: {e.response.text}")
+            print(f"  Response: {response_text}")
         sys.exit(1)
 
 
@@ -211,11 +252,6 @@ def main():
     # Get GitHub token
     token = get_github_token(args.token)
     
-    # Get username
-    print("\nAuthenticating with GitHub...")
-    username = get_github_username(token)
-    print(f"✓ Authenticated as: {username}")
-    
     # Ask if private or public (if not specified via command line)
     is_private = args.private
     if not args.private and sys.stdin.isatty():
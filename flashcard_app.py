@@ -3,14 +3,34 @@ Chinese Flashcard App - Interactive flashcard application similar to Quizlet
 Reads Chinese words from Excel file and displays them as interactive flashcards
 """
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-import pandas as pd
+from openpyxl import load_workbook
+import asyncio
+import functools
+import hashlib
+import logging
+from dataclasses import asdict, dataclass
 import re
+import socket
+import sys
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, List, Optional, Tuple
 import os
+import threading
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("flashcard")
 
 # Initialize FastAPI app
 app = FastAPI(title="Chinese Flashcard App", version="1.0.0")
@@ -23,22 +43,54 @@ templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
 
 # Path to Excel file - supports environment variable for deployment
 # Priority: 1. Environment variable, 2. Default path, 3. Current directory
-EXCEL_FILE_ENV = os.getenv("EXCEL_FILE_PATH")
 DEFAULT_EXCEL_PATH = Path(r"C:\Users\nieli\Documents\Flashcard\Chinese_words_list.xlsx")
 CURRENT_DIR_EXCEL = Path("Chinese_words_list.xlsx")
 
-# Determine which Excel file to use
-if EXCEL_FILE_ENV and Path(EXCEL_FILE_ENV).exists():
-    EXCEL_FILE_PATH = Path(EXCEL_FILE_ENV)
-elif DEFAULT_EXCEL_PATH.exists():
-    EXCEL_FILE_PATH = DEFAULT_EXCEL_PATH
-elif CURRENT_DIR_EXCEL.exists():
-    EXCEL_FILE_PATH = CURRENT_DIR_EXCEL
-else:
-    EXCEL_FILE_PATH = DEFAULT_EXCEL_PATH  # Will show error when loading
 
-# Cache for flashcards data
-flashcards_cache: List[Dict] = []
+@functools.cache
+def get_excel_path() -> Path:
+    """Determine which Excel file to use (resolved on first use, not at import)"""
+    excel_file_env = os.getenv("EXCEL_FILE_PATH")
+    if excel_file_env and Path(excel_file_env).exists():
+        return Path(excel_file_env)
+    if DEFAULT_EXCEL_PATH.exists():
+        return DEFAULT_EXCEL_PATH
+    if CURRENT_DIR_EXCEL.exists():
+        return CURRENT_DIR_EXCEL
+    return DEFAULT_EXCEL_PATH  # Will show error when loading
+
+
+@dataclass(frozen=True, slots=True)
+class Flashcard:
+    """A single flashcard parsed from the Excel file"""
+    id: int
+    word: str
+    pronunciation: str
+    meaning: str
+
+
+# Cache for flashcards data - parsed exactly once, guarded by a lock so that
+# concurrent first requests don't each trigger an Excel parse
+flashcards_cache: Optional[Tuple[Flashcard, ...]] = None
+_flashcards_lock = threading.Lock()
+
+# Number of words per block
+BLOCK_SIZE = 100
+
+# Pre-serialized /api/flashcards payloads keyed by block number (None = all flashcards).
+# Each payload is a sequence of byte chunks; the serialized cards of each block are
+# shared between the block payload and the full payload, so they're stored only once.
+block_chunks_cache: Dict[Optional[int], Tuple[bytes, ...]] = {}
+# Strong ETags for the payloads above, so clients can revalidate with If-None-Match
+block_etags_cache: Dict[Optional[int], str] = {}
+
+# Flashcard data is static for the life of the process
+FLASHCARDS_CACHE_CONTROL = "public, max-age=3600, immutable"
+
+# Precompiled patterns used by parse_sound_meaning
+_SPLIT_WS = re.compile(r'\s{2,}|\t+')
+_PINYIN_RE = re.compile(r'^([^\s()]+(?:[/\d]+)?(?:\s+[^\s()]+(?:[/\d]+)?)*)\s+([(].*|.+)')
+_WIDE_WS = re.compile(r'^(.+?)(\s{3,}|\t+)(.+)')
 
 
 def parse_sound_meaning(sound_meaning: str) -> tuple:
@@ -54,14 +106,21 @@ def parse_sound_meaning(sound_meaning: str) -> tuple:
     
     Returns: (pronunciation, meaning)
     """
-    if pd.isna(sound_meaning) or not sound_meaning:
+    if sound_meaning is None or not sound_meaning:
         return "", ""
     
     sound_meaning = str(sound_meaning).strip()
     
+    # Fast path for the common "pronunciation  meaning" layout: find the first
+    # run of 2+ spaces without the regex engine. Only valid if no other whitespace
+    # (tabs etc., which are non-printable) comes earlier - otherwise use Method 1.
+    idx = sound_meaning.find('  ')
+    if idx >= 0 and sound_meaning[:idx].isprintable():
+        return sound_meaning[:idx].strip(), sound_meaning[idx:].strip()
+    
     # Method 1: Split by multiple spaces (2 or more) or tabs
     # This handles cases like "yi1     one/1/single/a(n)"
-    parts = re.split(r'\s{2,}|\t+', sound_meaning, maxsplit=1)
+    parts = _SPLIT_WS.split(sound_meaning, maxsplit=1)
     
     if len(parts) == 2:
         pronunciation = parts[0].strip()
@@ -71,7 +130,7 @@ def parse_sound_meaning(sound_meaning: str) -> tuple:
     # Method 2: Look for pattern where pinyin ends (contains numbers or slashes)
     # and meaning starts (often with parentheses or after significant whitespace)
     # Pattern: pinyin (ends with number or /) followed by spaces and meaning
-    match = re.match(r'^([^\s()]+(?:[/\d]+)?(?:\s+[^\s()]+(?:[/\d]+)?)*)\s+([(].*|.+)', sound_meaning)
+    match = _PINYIN_RE.match(sound_meaning)
     if match:
         pronunciation = match.group(1).strip()
         meaning = match.group(2).strip()
@@ -79,7 +138,7 @@ def parse_sound_meaning(sound_meaning: str) -> tuple:
     
     # Method 3: Split by first occurrence of significant whitespace
     # Find the first instance of 3+ spaces or a tab
-    match = re.match(r'^(.+?)(\s{3,}|\t+)(.+)', sound_meaning)
+    match = _WIDE_WS.match(sound_meaning)
     if match:
         pronunciation = match.group(1).strip()
         meaning = match.group(3).strip()
@@ -99,123 +158,270 @@ def parse_sound_meaning(sound_meaning: str) -> tuple:
     return pronunciation, meaning
 
 
-def load_flashcards() -> List[Dict]:
-    """Load flashcards from Excel file and parse the data"""
-    global flashcards_cache
+def parse_sound_meanings(values: List) -> List[tuple]:
+    """
+    Parse a whole sound_meaning column at once.
+    
+    Identical cells (common for repeated characters and particles) are only
+    parsed once and share the resulting strings.
+    """
+    parsed_by_value: Dict = {}
+    results = []
+    for value in values:
+        parsed = parsed_by_value.get(value)
+        if parsed is None:
+            parsed = parse_sound_meaning(value)
+            parsed_by_value[value] = parsed
+        results.append(parsed)
+    return results
+
+
+def load_flashcards() -> Tuple[Flashcard, ...]:
+    """Return the cached flashcards, parsing the Excel file on first use"""
+    global flashcards_cache, block_chunks_cache, block_etags_cache
     
-    if flashcards_cache:
+    if flashcards_cache is not None:
         return flashcards_cache
     
+    with _flashcards_lock:
+        # Another thread may have finished loading while we waited for the lock
+        if flashcards_cache is None:
+            flashcards = _read_flashcards()
+            block_chunks_cache = _build_block_chunks(flashcards)
+            block_etags_cache = {
+                block: f'"{_sha256_chunks(chunks)}"'
+                for block, chunks in block_chunks_cache.items()
+            }
+            flashcards_cache = flashcards
+    return flashcards_cache
+
+
+def _read_flashcards() -> Tuple[Flashcard, ...]:
+    """Load flashcards from Excel file and parse the data"""
     try:
-        # Read Excel file
-        df = pd.read_excel(EXCEL_FILE_PATH)
-        
-        # Check if required columns exist
-        if 'word' not in df.columns or 'sound_meaning' not in df.columns:
-            raise ValueError("Excel file must contain 'word' and 'sound_meaning' columns")
-        
-        flashcards = []
-        
-        for idx, row in df.iterrows():
-            word = str(row['word']).strip()
-            sound_meaning = row['sound_meaning']
+        # Read Excel file in read-only mode, streaming rows as plain tuples
+        wb = load_workbook(get_excel_path(), read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            header_row = next(ws.iter_rows(max_row=1, values_only=True), ())
+            header = [str(col).strip() if col is not None else "" for col in header_row]
             
-            pronunciation, meaning = parse_sound_meaning(sound_meaning)
+            # Check if required columns exist
+            if 'word' not in header or 'sound_meaning' not in header:
+                raise ValueError("Excel file must contain 'word' and 'sound_meaning' columns")
             
-            flashcards.append({
-                'id': idx + 1,
-                'word': word,
-                'pronunciation': pronunciation,
-                'meaning': meaning
-            })
+            # Only read the span of columns we need (openpyxl columns are 1-based)
+            word_idx = header.index('word')
+            sound_meaning_idx = header.index('sound_meaning')
+            first_col = min(word_idx, sound_meaning_idx)
+            word_idx -= first_col
+            sound_meaning_idx -= first_col
+            
+            words = []
+            sound_meanings = []
+            for row in ws.iter_rows(
+                min_row=2,
+                min_col=first_col + 1,
+                max_col=first_col + max(word_idx, sound_meaning_idx) + 1,
+                values_only=True
+            ):
+                word = row[word_idx]
+                sound_meaning = row[sound_meaning_idx]
+                # Skip empty rows (read-only sheets may report trailing blanks)
+                if word is None and sound_meaning is None:
+                    continue
+                
+                words.append(str(word).strip() if word is not None else "")
+                sound_meanings.append(sound_meaning)
+        finally:
+            wb.close()
+        
+        # Parse the whole sound_meaning column in one batch
+        parsed = parse_sound_meanings(sound_meanings)
         
-        flashcards_cache = flashcards
-        return flashcards
+        # Intern strings so repeated words/pinyin/meanings share one object
+        return tuple(
+            Flashcard(idx, sys.intern(word), sys.intern(pronunciation), sys.intern(meaning))
+            for idx, (word, (pronunciation, meaning)) in enumerate(zip(words, parsed), start=1)
+        )
     
     except FileNotFoundError:
-        raise FileNotFoundError(f"Excel file not found at: {EXCEL_FILE_PATH}")
+        raise FileNotFoundError(f"Excel file not found at: {get_excel_path()}")
     except Exception as e:
         raise Exception(f"Error loading flashcards: {str(e)}")
 
 
+def dumps_json(payload) -> bytes:
+    """Serialize a payload (which may contain Flashcards) to UTF-8 JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_DATACLASS)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=asdict).encode("utf-8")
+
+
+def _json_tail(fields: Dict) -> bytes:
+    """Serialize the fields that follow the flashcards array: ',"total":...}'"""
+    return b"," + dumps_json(fields)[1:]
+
+
+def _build_block_chunks(flashcards: Tuple[Flashcard, ...]) -> Dict[Optional[int], Tuple[bytes, ...]]:
+    """Serialize the /api/flashcards payload for every block once
+    
+    Each block's cards are serialized a single time; the full payload is built
+    from the same chunks and is streamed rather than joined.
+    """
+    total = len(flashcards)
+    total_blocks = (total + BLOCK_SIZE - 1) // BLOCK_SIZE  # Ceiling division
+    
+    head = b'{"flashcards":['
+    chunks: Dict[Optional[int], Tuple[bytes, ...]] = {}
+    all_chunks = [head]
+    for block in range(1, total_blocks + 1):
+        start_idx = (block - 1) * BLOCK_SIZE
+        end_idx = min(start_idx + BLOCK_SIZE, total)
+        block_flashcards = flashcards[start_idx:end_idx]
+        # Serialized array without the surrounding brackets
+        cards_json = dumps_json(block_flashcards)[1:-1]
+        
+        chunks[block] = (head, cards_json, b"]" + _json_tail({
+            "total": len(block_flashcards),
+            "block": block,
+            "total_blocks": total_blocks,
+            "block_range": f"{start_idx + 1}-{end_idx}"
+        }))
+        if block > 1:
+            all_chunks.append(b",")
+        all_chunks.append(cards_json)
+    
+    all_chunks.append(b"]" + _json_tail({"total": total, "total_blocks": total_blocks}))
+    chunks[None] = tuple(all_chunks)
+    return chunks
+
+
+def _sha256_chunks(chunks: Tuple[bytes, ...]) -> str:
+    """Hash a payload made of byte chunks"""
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def get_cached_flashcards() -> Tuple[Flashcard, ...]:
+    """Return flashcards, parsing off the event loop on a cache miss"""
+    if flashcards_cache is not None:
+        return flashcards_cache
+    return await asyncio.to_thread(load_flashcards)
+
+
+@app.on_event("startup")
+async def warm_flashcards_cache():
+    """Parse the Excel file at startup so the first request is served from cache"""
+    try:
+        await asyncio.to_thread(load_flashcards)
+    except Exception as e:
+        # Don't block startup - the API reports the error on request
+        logger.warning("Could not preload flashcards: %s", e)
+
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
     """Serve the main flashcard page"""
     return templates.TemplateResponse("flashcard.html", {"request": request})
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison is allowed for If-None-Match
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
 @app.get("/api/flashcards")
-async def get_flashcards(block: int = None):
+async def get_flashcards(request: Request, block: int = None):
     """API endpoint to get all flashcards or filtered by block
     
     Args:
-        block: Optional block number (1-based). Each block contains 100 words.
+        block: Optional block number (1-based). Each block contains BLOCK_SIZE words.
               If None, returns all flashcards.
     """
     try:
-        flashcards = load_flashcards()
-        total = len(flashcards)
-        
-        # Calculate total number of blocks
-        total_blocks = (total + 99) // 100  # Ceiling division
+        await get_cached_flashcards()
         
-        # Filter by block if specified
-        if block is not None:
-            start_idx = (block - 1) * 100
-            end_idx = min(start_idx + 100, total)
-            filtered_flashcards = flashcards[start_idx:end_idx]
-            return {
-                "flashcards": filtered_flashcards,
-                "total": len(filtered_flashcards),
-                "block": block,
-                "total_blocks": total_blocks,
-                "block_range": f"{start_idx + 1}-{end_idx}"
-            }
+        chunks = block_chunks_cache.get(block)
+        if chunks is None:
+            return {"error": f"Invalid block: {block}", "flashcards": [], "total": 0}
         
-        return {
-            "flashcards": flashcards,
-            "total": total,
-            "total_blocks": total_blocks
+        headers = {
+            "ETag": block_etags_cache[block],
+            "Cache-Control": FLASHCARDS_CACHE_CONTROL
         }
-    except Exception as e:
-        return {"error": str(e), "flashcards": [], "total": 0}
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        if block is None:
+            # Stream the full list chunk by chunk instead of joining it into one buffer
+            return StreamingResponse(iter(chunks), media_type="application/json", headers=headers)
+        return Response(content=b"".join(chunks), media_type="application/json", headers=headers)
+    except Exception:
+        logger.exception("Error serving /api/flashcards")
+        return {"error": "Error loading flashcards", "flashcards": [], "total": 0}
 
 
 @app.get("/api/flashcard/{card_id}")
 async def get_flashcard(card_id: int):
     """API endpoint to get a specific flashcard by ID"""
-    flashcards = load_flashcards()
+    flashcards = await get_cached_flashcards()
     
     if card_id < 1 or card_id > len(flashcards):
         return {"error": "Flashcard not found"}
     
-    return flashcards[card_id - 1]
+    return Response(content=dumps_json(flashcards[card_id - 1]), media_type="application/json")
+
+
+def pick_port(candidates: List[int], host: str = "0.0.0.0") -> int:
+    """Return the first candidate port that can be bound, or the last one"""
+    for port in candidates:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if os.name == "nt":
+            # SO_REUSEADDR on Windows lets the probe bind a port another process is
+            # listening on; exclusive use makes a busy port fail to bind instead
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        else:
+            # Ignore sockets left in TIME_WAIT by a previous run, as uvicorn does
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+            return port
+        except OSError:
+            logger.info("Port %d is busy, trying next port...", port)
+        finally:
+            sock.close()
+    return candidates[-1]
 
 
 if __name__ == "__main__":
+    import importlib.util
     import uvicorn
-    print("=" * 60)
-    print("Starting Chinese Flashcard App...")
-    print(f"Excel file path: {EXCEL_FILE_PATH}")
-    print(f"Excel file exists: {EXCEL_FILE_PATH.exists()}")
-    print(f"Template directory: {TEMPLATE_DIR}")
-    print(f"Template directory exists: {TEMPLATE_DIR.exists()}")
-    print("=" * 60)
+    logger.info("Starting Chinese Flashcard App...")
+    logger.info("Excel file path: %s (exists: %s)", get_excel_path(), get_excel_path().exists())
+    logger.info("Template directory: %s (exists: %s)", TEMPLATE_DIR, TEMPLATE_DIR.exists())
     # Try port 8001 first, if busy try 8002
-    import socket
-    port = 8001
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    result = sock.connect_ex(('127.0.0.1', port))
-    sock.close()
-    if result == 0:
-        print(f"Port {port} is busy, trying port 8002...")
-        port = 8002
+    port = pick_port([8001, 8002])
     
     # Use PORT environment variable if available (for cloud deployment)
     port = int(os.getenv("PORT", port))
     
-    print(f"Server starting at: http://localhost:{port}")
-    print("Press Ctrl+C to stop the server")
-    print("=" * 60)
-    uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
+    logger.info("Server starting at: http://localhost:%d", port)
+    logger.info("Press Ctrl+C to stop the server")
+    # Use uvloop/httptools when available (uvicorn[standard] installs them, except on
+    # Windows) and WEB_CONCURRENCY worker processes; each worker preloads its own cache
+    uvicorn.run(
+        "flashcard_app:app",
+        host="0.0.0.0",
+        port=port,
+        log_level="info",
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
 
@@ -1,22 +1,53 @@
 """
 Interactive Test UI Application for PDF-based tests
 """
+import asyncio
+import bisect
+import functools
+import importlib.util
 import os
 import re
 import json
+import tempfile
+import string
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
 from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 import pdfplumber
 try:
-    import pandas as pd
-    EXCEL_AVAILABLE = True
+    from openpyxl import load_workbook
+    OPENPYXL_AVAILABLE = True
 except ImportError:
-    EXCEL_AVAILABLE = False
-    print("Warning: pandas not installed. Excel file support disabled. Install with: pip install pandas openpyxl")
+    OPENPYXL_AVAILABLE = False
+# pandas is slow to import, so only check that it is installed; it is imported on first use
+PANDAS_AVAILABLE = importlib.util.find_spec("pandas") is not None
+# .xlsx keys are read with openpyxl; pandas is only needed for legacy .xls files
+EXCEL_AVAILABLE = OPENPYXL_AVAILABLE or PANDAS_AVAILABLE
+if not EXCEL_AVAILABLE:
+    print("Warning: openpyxl not installed. Excel file support disabled. Install with: pip install openpyxl")
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+from difflib import SequenceMatcher
+try:
+    from rapidfuzz.fuzz import ratio as _fuzz_ratio
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("test_ui")
 
 app = FastAPI(title="Interactive Test UI")
 
@@ -36,6 +67,53 @@ if not TEMPLATE_DIR.exists():
 templates = Jinja2Templates(directory=str(TEMPLATE_DIR))
 
 
+@functools.cache
+def _template(name: str):
+    """Compiled template, resolved once instead of re-checked on every render"""
+    return templates.get_template(name)
+
+
+# Precompiled regex patterns (used per line of every PDF page)
+# clean_text: headers, footers, page numbers
+_UNWANTED_RES = [
+    re.compile(r'USABO\s+Open\s+Exam', re.IGNORECASE),
+    re.compile(r'Answer\s+Key', re.IGNORECASE),
+    re.compile(r'Page\s+\d+', re.IGNORECASE),
+    re.compile(r'^\d+\s*$', re.IGNORECASE),  # Standalone page numbers
+    re.compile(r'^Page\s+\d+', re.IGNORECASE),
+]
+_UNWANTED_HINT_RE = re.compile(r'\d|USABO|Answer', re.IGNORECASE)
+# Question PDFs
+# Header/footer lines and bare page numbers, tested with a single match per line
+_SKIP_LINE_RE = re.compile(r'^(?:USABO|Answer Key|Page \d+|\d+)$', re.IGNORECASE)
+# Question numbers - MUST start at beginning of line
+_QUESTION_RE = re.compile(r'^(\d+)\.\s*(.+)$')
+# Choices: "[ ] A." or "A." format
+_CHOICE_BRACKET_RE = re.compile(r'^\[\s*\]\s*([A-E])\.\s*(.+)$')
+_CHOICE_SIMPLE_RE = re.compile(r'^([A-E])[\)\.]\s*(.+)$')
+_INLINE_CHOICE_MARKER_RE = re.compile(r'\[\s*\]\s*[A-E]\.')
+_INLINE_CHOICE_RE = re.compile(r'\[\s*\]\s*([A-E])\.\s*([^\[\]]+?)(?=\s*\[\s*\]\s*[A-E]\.|$)')
+_INLINE_CHOICE_TEXT_RE = re.compile(r'\[\s*\]\s*[A-E]\.[^\[\]]+')
+_BRACKETS_RE = re.compile(r'\[\s*\]')
+_WS_RE = re.compile(r'\s+')
+# Answer key PDFs
+_CHOICE_LETTER_RE = re.compile(r'\b([A-E])\.')
+_DIGIT_BEFORE_DOT_RE = re.compile(r'\d(?=\.)')
+_CHECKBOX_RE = re.compile(r'\[[Xx✓☑]\s*\]\s*([A-E])\.')
+_QUESTION_START_RE = re.compile(r'^(\d+)\.')
+_COMPACT_ANSWER_RE = re.compile(r'(\d+)[\.\)]\s*([A-E])', re.IGNORECASE)
+# First answer letter in an Excel cell or a displayed answer
+_ANSWER_LETTER_RE = re.compile(r'[A-E]')
+# Standalone "3. B" / "3) B." or "3 B" lines; a trailing "." / ")" is only allowed after "3." / "3)"
+_STANDALONE_LINE_RE = re.compile(r'^(\d+)(?:([\.\)])\s*|\s+)([A-E])(?(2)[\.\)]?)\s*$', re.IGNORECASE)
+# "3. Answer: B" / "Question 3: B" / "Q3: B" labels, tried in this order
+_ANSWER_LABEL_RES = [
+    re.compile(r'(\d+)[\.\)]\s*Answer[:\s]+([A-E])', re.IGNORECASE),
+    re.compile(r'Question\s+(\d+)[:\s]+([A-E])', re.IGNORECASE),
+    re.compile(r'Q\s*(\d+)[:\s]+([A-E])', re.IGNORECASE),
+]
+
+
 class Question:
     """Represents a question from the PDF"""
     def __init__(self, number: int, text: str, question_type: str, choices: Optional[List[str]] = None):
@@ -49,22 +127,18 @@ def clean_text(text: str) -> str:
     """Remove unwanted text like headers, footers, page numbers"""
     if not text:
         return ""
+    # Every unwanted pattern needs a digit, "USABO" or "Answer"; most choice texts have none
+    if not _UNWANTED_HINT_RE.search(text):
+        return text.strip()
     # Remove common unwanted patterns
-    unwanted_patterns = [
-        r'USABO\s+Open\s+Exam',
-        r'Answer\s+Key',
-        r'Page\s+\d+',
-        r'^\d+\s*$',  # Standalone page numbers
-        r'^Page\s+\d+',
-    ]
-    
-    for pattern in unwanted_patterns:
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    for pattern in _UNWANTED_RES:
+        text = pattern.sub('', text)
     
     return text.strip()
 
 
-def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
+@functools.lru_cache(maxsize=64)
+def _parse_questions(pdf_path: Path, mtime_ns: Optional[int], size: Optional[int]) -> List[Question]:
     """
     Extract questions from PDF file with improved filtering
     Handles multiple formats:
@@ -75,48 +149,31 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
     
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            full_text = ""
+            page_texts = []
             for page in pdf.pages:
                 page_text = page.extract_text()
                 if page_text:
-                    full_text += page_text + "\n"
+                    page_texts.append(page_text)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading PDF: {str(e)}")
     
-    if not full_text.strip():
+    if not any(page_text.strip() for page_text in page_texts):
         raise HTTPException(status_code=500, detail="PDF appears to be empty or unreadable")
     
-    # Clean the full text
-    full_text = clean_text(full_text)
+    # Join the pages once and clean the full text (header patterns can span line breaks)
+    full_text = clean_text("\n".join(page_texts) + "\n")
     
-    # Split into lines for processing
-    lines = full_text.split('\n')
-    filtered_lines = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            filtered_lines.append("")  # Keep empty lines as separators
-            continue
-        # Skip header/footer lines
-        if re.match(r'^(USABO|Answer Key|Page \d+)$', line, re.IGNORECASE):
-            continue
-        # Skip lines that are just page numbers
-        if re.match(r'^\d+$', line):
-            continue
-        filtered_lines.append(line)
-    
-    # Pattern to identify question numbers - MUST start at beginning of line
-    question_pattern = re.compile(r'^(\d+)\.\s*(.+)$')
-    # Pattern to identify choices: "[ ] A." or "A." format
-    choice_pattern_with_brackets = re.compile(r'^\[\s*\]\s*([A-E])\.\s*(.+)$')
-    choice_pattern_simple = re.compile(r'^([A-E])[\)\.]\s*(.+)$')
+    # Split into stripped lines, keeping empty lines as separators and skipping
+    # header/footer lines and lines that are just page numbers
+    stripped_lines = (line.strip() for line in full_text.split('\n'))
+    filtered_lines = [line for line in stripped_lines if not line or not _SKIP_LINE_RE.match(line)]
     
     i = 0
     while i < len(filtered_lines):
         line = filtered_lines[i]
         
             # Check if this is a question number
-        question_match = question_pattern.match(line)
+        question_match = _QUESTION_RE.match(line)
         if question_match:
             question_num = int(question_match.group(1))
             # Start with the question text from the first line
@@ -126,9 +183,8 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
             has_inline_choices = False
             
             # Check for inline choices with [ ] markers on the same line
-            if '[]' in line or re.search(r'\[\s*\]\s*[A-E]\.', line):
-                inline_choice_pattern = r'\[\s*\]\s*([A-E])\.\s*([^\[\]]+?)(?=\s*\[\s*\]\s*[A-E]\.|$)'
-                inline_matches = re.finditer(inline_choice_pattern, line)
+            if '[]' in line or _INLINE_CHOICE_MARKER_RE.search(line):
+                inline_matches = _INLINE_CHOICE_RE.finditer(line)
                 for m in inline_matches:
                     choice_text = m.group(2).strip()
                     choice_text = clean_text(choice_text)
@@ -136,7 +192,7 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
                         choices.append(choice_text)
                 has_inline_choices = True
                 # Remove choices from question text
-                question_text_parts[0] = re.sub(r'\[\s*\]\s*[A-E]\.[^\[\]]+', '', question_text_parts[0]).strip()
+                question_text_parts[0] = _INLINE_CHOICE_TEXT_RE.sub('', question_text_parts[0]).strip()
             
             # Look ahead to collect all question text lines before first choice
             if not has_inline_choices:
@@ -149,13 +205,18 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
                     next_line = filtered_lines[j]
                     
                     # CRITICAL: Stop immediately if we hit another question number
-                    if question_pattern.match(next_line):
+                    if _QUESTION_RE.match(next_line):
                             break
                     
                     # Check if this line is a choice - try [ ] A. format first (most common)
-                    choice_match = choice_pattern_with_brackets.match(next_line)
-                    if not choice_match:
-                        choice_match = choice_pattern_simple.match(next_line)
+                    # Only lines starting with "[" or A-E can be choices, so prose lines skip both regexes
+                    first_char = next_line[:1]
+                    if first_char == '[':
+                        choice_match = _CHOICE_BRACKET_RE.match(next_line)
+                    elif first_char and first_char in 'ABCDE':
+                        choice_match = _CHOICE_SIMPLE_RE.match(next_line)
+                    else:
+                        choice_match = None
                     
                     if choice_match:
                         # Found first choice - stop collecting question text, start collecting choices
@@ -173,7 +234,7 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
                         # Not a choice line
                         if found_first_choice:
                             # We've already found at least one choice - collecting more choices
-                            if not next_line.strip():
+                            if not next_line:
                                 # Empty line - continue collecting choices (allow empty lines between choices)
                                 consecutive_non_choice += 1
                             else:
@@ -184,8 +245,8 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
                         else:
                             # Haven't found first choice yet - this is part of question text
                             # Collect ALL lines until we find the first [ ] A. choice
-                            if next_line.strip():  # Only add non-empty lines
-                                question_text_parts.append(next_line.strip())
+                            if next_line:  # Only add non-empty lines
+                                question_text_parts.append(next_line)
                     
                     j += 1
             
@@ -193,9 +254,9 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
             # Then replace multiple newlines with single space, but keep structure
             question_text = "\n".join(question_text_parts)
             question_text = clean_text(question_text)
-            question_text = re.sub(r'\[\s*\]', '', question_text).strip()
+            question_text = _BRACKETS_RE.sub('', question_text).strip()
             # Replace multiple whitespace/newlines with single space for cleaner display
-            question_text = re.sub(r'\s+', ' ', question_text).strip()
+            question_text = _WS_RE.sub(' ', question_text).strip()
             
             # Create question object
             if len(choices) >= 2:
@@ -208,18 +269,13 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
         else:
             i += 1
     
-    # Final cleaning
-    for q in questions:
-        q.text = clean_text(q.text)
-        q.text = re.sub(r'\[\s*\]', '', q.text).strip()
-        q.choices = [clean_text(c) for c in q.choices if clean_text(c)]
-    
     # Remove duplicates (keep first occurrence) and sort by question number
-    seen_numbers = {}
+    # (text and choices were already cleaned when each question was built)
+    seen_numbers = set()
     unique_questions = []
     for q in questions:
         if q.number not in seen_numbers:
-            seen_numbers[q.number] = True
+            seen_numbers.add(q.number)
             unique_questions.append(q)
     
     unique_questions.sort(key=lambda x: x.number)
@@ -227,7 +283,77 @@ def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
     return unique_questions
 
 
-def extract_answer_key_from_pdf(key_path: Path) -> Dict[int, str]:
+def _is_yellow(color) -> bool:
+    """Check whether a pdfplumber RGB fill color is a yellow highlight"""
+    if color and isinstance(color, tuple) and len(color) == 3:
+        r, g, b = color
+        return r > 0.8 and g > 0.8 and b < 0.3
+    return False
+
+
+def _scan_highlight_chars(chars: List[Dict], yellow_rects: List[Dict]):
+    """
+    Locate question-number anchors ("12.") and, for every yellow rectangle that
+    covers text, the text of the characters near it.
+    Returns (question_positions, [(rect_center_y, rect_x0, nearby_text), ...])
+    """
+    question_positions = {}
+    highlight_texts = []
+    
+    # Question numbers: a digit glyph followed by a "." glyph. When every glyph is a single
+    # character, string offsets in the page text are glyph indices and one regex scan finds them
+    char_text = ''.join(c['text'] for c in chars)
+    if len(char_text) == len(chars):
+        anchors = [m.start() for m in _DIGIT_BEFORE_DOT_RE.finditer(char_text)]
+    else:
+        anchors = [i for i in range(len(chars) - 1) if chars[i]['text'].isdigit() and chars[i + 1]['text'] == '.']
+    for i in anchors:
+        # Up to three digits ending at the anchor form the number
+        question_digits = [chars[j]['text'] for j in range(max(0, i - 2), i + 1) if chars[j]['text'].isdigit()]
+        q_num = int(''.join(question_digits))
+        if q_num not in question_positions:
+            question_positions[q_num] = {'y': chars[i]['top'], 'x': chars[i]['x0']}
+    
+    if NUMPY_AVAILABLE:
+        # Column arrays so each rectangle is a handful of vector comparisons
+        count = len(chars)
+        x0 = np.fromiter((c['x0'] for c in chars), dtype=float, count=count)
+        x1 = np.fromiter((c['x1'] for c in chars), dtype=float, count=count)
+        y0 = np.fromiter((c['y0'] for c in chars), dtype=float, count=count)
+        y1 = np.fromiter((c['y1'] for c in chars), dtype=float, count=count)
+        top = np.fromiter((c['top'] for c in chars), dtype=float, count=count)
+        texts = np.array([c['text'] for c in chars], dtype=object)
+        center_y = (y0 + y1) / 2
+        
+        for yellow_rect in yellow_rects:
+            overlap = ((x0 < yellow_rect['x1']) & (x1 > yellow_rect['x0']) &
+                       (y0 < yellow_rect['y1']) & (y1 > yellow_rect['y0']))
+            if not overlap.any():
+                continue
+            rect_center_y = (yellow_rect['y0'] + yellow_rect['y1']) / 2
+            rect_x0 = yellow_rect['x0']
+            nearby = np.flatnonzero((np.abs(x0 - rect_x0) < 50) & (np.abs(center_y - rect_center_y) < 20))
+            nearby = nearby[np.lexsort((x0[nearby], top[nearby]))]
+            highlight_texts.append((rect_center_y, rect_x0, ''.join(texts[nearby])))
+        return question_positions, highlight_texts
+    
+    for yellow_rect in yellow_rects:
+        rect_center_y = (yellow_rect['y0'] + yellow_rect['y1']) / 2
+        rect_x0 = yellow_rect['x0']
+        
+        # Skip rectangles that do not cover any text
+        if not any(c['x0'] < yellow_rect['x1'] and c['x1'] > yellow_rect['x0'] and
+                   c['y0'] < yellow_rect['y1'] and c['y1'] > yellow_rect['y0'] for c in chars):
+            continue
+        
+        nearby_chars = [c for c in chars if abs(c['x0'] - rect_x0) < 50 and abs((c['y0'] + c['y1']) / 2 - rect_center_y) < 20]
+        nearby_text = ''.join([c['text'] for c in sorted(nearby_chars, key=lambda x: (x['top'], x['x0']))])
+        highlight_texts.append((rect_center_y, rect_x0, nearby_text))
+    return question_positions, highlight_texts
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_answer_key_pdf(key_path: Path, mtime_ns: Optional[int], size: Optional[int]) -> Dict[int, str]:
     """
     Extract answer key from PDF file
     Tries multiple methods: yellow highlights, filled checkboxes, text patterns
@@ -235,217 +361,140 @@ def extract_answer_key_from_pdf(key_path: Path) -> Dict[int, str]:
     """
     answer_key = {}
     
-    try:
-        with pdfplumber.open(key_path) as pdf:
-            # Extract text from all pages
-            full_text = ""
-            page_texts = []
-            for page_num, page in enumerate(pdf.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    full_text += page_text + "\n"
-                    page_texts.append({
-                        'page_num': page_num,
-                        'text': page_text,
-                        'chars': page.chars,
-                        'page': page
-                    })
-            
-            if not full_text.strip():
-                print("Warning: PDF appears to be empty or unreadable")
-                return answer_key
-            
-            full_text = clean_text(full_text)
-            lines = full_text.split('\n')
-            
-            # METHOD 1: Try yellow highlight detection (if highlights exist)
-            yellow_answers = {}
-            for page_data in page_texts:
-                page = page_data['page']
-                chars = page_data['chars']
+    with pdfplumber.open(key_path) as pdf:
+        # Extract text from all pages; characters are only kept for pages
+        # with yellow highlights, text-only keys never need them
+        page_texts = []
+        highlighted_pages = []
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                page_texts.append(page_text)
                 rects = page.rects if hasattr(page, 'rects') else []
-                
-                # Find yellow rectangles
-                yellow_rects = []
-                for rect in rects:
-                    color = rect.get('non_stroking_color', None)
-                    if color and isinstance(color, tuple) and len(color) == 3:
-                        r, g, b = color
-                        if r > 0.8 and g > 0.8 and b < 0.3:  # Yellow
-                            yellow_rects.append(rect)
-                
-                # Process yellow highlights (same logic as before)
+                yellow_rects = [rect for rect in rects if _is_yellow(rect.get('non_stroking_color', None))]
                 if yellow_rects:
-                    # Build question positions map
-                    question_positions = {}
-                    for i, char in enumerate(chars):
-                        if char['text'].isdigit() and i + 1 < len(chars):
-                            if chars[i + 1]['text'] == '.':
-                                question_digits = []
-                                for j in range(max(0, i - 2), i + 1):
-                                    if chars[j]['text'].isdigit():
-                                        question_digits.append(chars[j]['text'])
-                                if question_digits:
-                                    q_num = int(''.join(question_digits))
-                                    if q_num not in question_positions:
-                                        question_positions[q_num] = {'y': char['top'], 'x': char['x0']}
+                    highlighted_pages.append((page.chars, yellow_rects))
+                    continue
+            # Drop the page's cached layout objects
+            page.flush_cache()
+        
+        if not any(page_text.strip() for page_text in page_texts):
+            print("Warning: PDF appears to be empty or unreadable")
+            return answer_key
+        
+        # Join the pages once (header patterns in clean_text can span line breaks)
+        lines = clean_text("\n".join(page_texts) + "\n").split('\n')
+        
+        # METHOD 1: Try yellow highlight detection (if highlights exist)
+        yellow_answers = {}
+        for chars, yellow_rects in highlighted_pages:
+            # Build question positions map and the text next to each highlight
+            question_positions, highlight_texts = _scan_highlight_chars(chars, yellow_rects)
+            # Questions sorted by y (then by discovery order, which breaks ties as before)
+            sorted_questions = sorted(
+                (q_pos['y'], order, q_pos['x'], q_num)
+                for order, (q_num, q_pos) in enumerate(question_positions.items())
+            )
+            question_ys = [entry[0] for entry in sorted_questions]
+            
+            # Map yellow highlights to questions (simplified version)
+            for rect_center_y, rect_x0, nearby_text in highlight_texts:
+                # Find choice letter nearby
+                choice_match = _CHOICE_LETTER_RE.search(nearby_text)
+                
+                if choice_match:
+                    answer_letter = choice_match.group(1).upper()
+                    # Find nearest question above
+                    # Only questions with rect_center_y < y <= rect_center_y + 200 can qualify
+                    best_q = None
+                    best_order = None
+                    min_dist = float('inf')
+                    start = bisect.bisect_right(question_ys, rect_center_y)
+                    end = bisect.bisect_right(question_ys, rect_center_y + 200, start)
+                    for q_y, order, q_x, q_num in sorted_questions[start:end]:
+                        dist = q_y - rect_center_y
+                        x_diff = abs(q_x - rect_x0)
+                        if x_diff < 200 and dist < 200:
+                            weighted = dist + (x_diff * 0.5)
+                            if weighted < min_dist or (weighted == min_dist and order < best_order):
+                                min_dist = weighted
+                                best_q = q_num
+                                best_order = order
                     
-                    # Map yellow highlights to questions (simplified version)
-                    for yellow_rect in yellow_rects:
-                        rect_center_y = (yellow_rect['y0'] + yellow_rect['y1']) / 2
-                        rect_x0 = yellow_rect['x0']
-                        
-                        # Find overlapping text
-                        overlapping_chars = [c for c in chars if 
-                                           (c['x0'] < yellow_rect['x1'] and c['x1'] > yellow_rect['x0'] and
-                                            c['y0'] < yellow_rect['y1'] and c['y1'] > yellow_rect['y0'])]
-                        
-                        if overlapping_chars:
-                            highlighted_text = ''.join([c['text'] for c in sorted(overlapping_chars, key=lambda x: (x['top'], x['x0']))]).strip()
-                            
-                            # Find choice letter nearby
-                            nearby_chars = [c for c in chars if abs(c['x0'] - rect_x0) < 50 and abs((c['y0'] + c['y1']) / 2 - rect_center_y) < 20]
-                            nearby_text = ''.join([c['text'] for c in sorted(nearby_chars, key=lambda x: (x['top'], x['x0']))])
-                            choice_match = re.search(r'\b([A-E])\.', nearby_text)
-                            
-                            if choice_match:
-                                answer_letter = choice_match.group(1).upper()
-                                # Find nearest question above
-                                best_q = None
-                                min_dist = float('inf')
-                                for q_num, q_pos in question_positions.items():
-                                    if q_pos['y'] > rect_center_y:
-                                        dist = q_pos['y'] - rect_center_y
-                                        x_diff = abs(q_pos['x'] - rect_x0)
-                                        if x_diff < 200 and dist < 200:
-                                            weighted = dist + (x_diff * 0.5)
-                                            if weighted < min_dist:
-                                                min_dist = weighted
-                                                best_q = q_num
-                                
-                                if best_q and answer_letter in ['A', 'B', 'C', 'D', 'E']:
-                                    yellow_answers[best_q] = answer_letter
+                    if best_q and answer_letter in ['A', 'B', 'C', 'D', 'E']:
+                        yellow_answers[best_q] = answer_letter
+        
+        # METHOD 2: Text-based extraction (primary method for non-highlighted keys)
+        # Single walk over the lines; each pattern collects into its own dict so the
+        # original precedence (pattern 1 over 2 over 3 over 4) is kept when merging
+        checkbox_answers = {}
+        compact_answers = {}
+        standalone_answers = {}
+        label_answers = {}
+        for i, line in enumerate(lines):
+            line = line.strip()
+            if not line:
+                continue
             
-            # METHOD 2: Text-based extraction (primary method for non-highlighted keys)
             # Pattern 1: Filled checkboxes [X] A. or [✓] A. or [☑] A.
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Look for filled checkbox pattern: [X] A. or [✓] A. or [☑] A.
-                checkbox_pattern = r'\[[Xx✓☑]\s*\]\s*([A-E])\.'
-                match = re.search(checkbox_pattern, line)
-                if match:
-                    answer_letter = match.group(1).upper()
-                    # Look backwards for question number
-                    for j in range(max(0, i - 15), i + 1):
-                        q_match = re.search(r'^(\d+)\.', lines[j])
-                        if q_match:
-                            q_num = int(q_match.group(1))
-                            if q_num not in answer_key:
-                                answer_key[q_num] = answer_letter
-                            break
+            match = _CHECKBOX_RE.search(line)
+            if match:
+                answer_letter = match.group(1).upper()
+                # Look backwards for question number
+                for j in range(max(0, i - 15), i + 1):
+                    q_match = _QUESTION_START_RE.search(lines[j])
+                    if q_match:
+                        checkbox_answers.setdefault(int(q_match.group(1)), answer_letter)
+                        break
             
             # Pattern 2: Simple answer list format: "1. A 2. B 3. C" or "1. A\n2. B\n3. C"
-            # Check for compact format on single line
-            compact_pattern = r'(\d+)[\.\)]\s*([A-E])(?:\s+(\d+)[\.\)]\s*([A-E]))*'
-            for line in lines:
-                line = line.strip()
-                if not line or len(line) > 200:  # Skip very long lines
-                    continue
-                
-                # Find all matches in this line
-                matches = re.findall(r'(\d+)[\.\)]\s*([A-E])', line, re.IGNORECASE)
-                for match in matches:
-                    q_num = int(match[0])
-                    answer = match[1].upper()
-                    if answer in ['A', 'B', 'C', 'D', 'E']:
-                        if q_num not in answer_key:
-                            answer_key[q_num] = answer
+            if len(line) <= 200:  # Skip very long lines
+                for q_num, answer in _COMPACT_ANSWER_RE.findall(line):
+                    compact_answers.setdefault(int(q_num), answer.upper())
             
             # Pattern 3: Standalone answer lines: "3. B" or "3) B" or "3 B" or "1 C"
-            # This is the most common format: number followed by space and letter
-            standalone_patterns = [
-                r'^(\d+)[\.\)]\s*([A-E])[\.\)]?\s*$',  # "3. B" or "3) B"
-                r'^(\d+)\s+([A-E])\s*$',                # "3 B" or "1 C" (one or more spaces)
-                r'^(\d+)\s([A-E])\s*$',                 # "3 B" or "1 C" (single space)
-            ]
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Skip header lines
-                if line.lower() in ['questions answers', 'answers', 'answer key', 'key']:
-                    continue
-                
-                # Skip lines that look like questions (too long or have question text)
-                # But allow short lines that match our pattern
-                if len(line) > 50 and not re.match(r'^\d+[\.\)\s]+[A-E]', line, re.IGNORECASE):
-                    continue
-                
-                for pattern in standalone_patterns:
-                    match = re.match(pattern, line, re.IGNORECASE)
-                    if match:
-                        q_num = int(match.group(1))
-                        answer = match.group(2).upper()
-                        if answer in ['A', 'B', 'C', 'D', 'E']:
-                            if q_num not in answer_key:
-                                answer_key[q_num] = answer
-                            break
-            
             # Pattern 4: Answer key format: "Question 3: B" or "3. Answer: B"
-            answer_label_patterns = [
-                r'(\d+)[\.\)]\s*Answer[:\s]+([A-E])',
-                r'Question\s+(\d+)[:\s]+([A-E])',
-                r'Q\s*(\d+)[:\s]+([A-E])',
-            ]
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                for pattern in answer_label_patterns:
-                    match = re.search(pattern, line, re.IGNORECASE)
-                    if match:
-                        q_num = int(match.group(1))
-                        answer = match.group(2).upper()
-                        if answer in ['A', 'B', 'C', 'D', 'E']:
-                            if q_num not in answer_key:
-                                answer_key[q_num] = answer
-                            break
-            
-            # Pattern 5: Look for answers in question context (if key file has full questions)
-            # Find questions with filled checkboxes in the same context
-            for i, line in enumerate(lines):
-                q_match = re.search(r'^(\d+)\.', line)
-                if q_match:
-                    q_num = int(q_match.group(1))
-                    # Look ahead in next 10 lines for filled checkbox
-                    for j in range(i + 1, min(i + 11, len(lines))):
-                        next_line = lines[j].strip()
-                        # Check if this is a new question (stop searching)
-                        if re.match(r'^\d+\.', next_line):
-                            break
-                        # Look for filled checkbox
-                        checkbox_match = re.search(r'\[[Xx✓☑]\s*\]\s*([A-E])\.', next_line)
-                        if checkbox_match:
-                            answer_letter = checkbox_match.group(1).upper()
-                            if q_num not in answer_key:
-                                answer_key[q_num] = answer_letter
-                            break
-            
-            # Merge yellow highlight results (they take precedence if found)
-            answer_key.update(yellow_answers)
-            
-    except Exception as e:
-        print(f"Warning: Error reading key PDF: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return answer_key
+            match = _STANDALONE_LINE_RE.match(line)
+            if match:
+                standalone_answers.setdefault(int(match.group(1)), match.group(3).upper())
+                continue
+            # A standalone line never carries a label; otherwise the first label
+            # pattern that matches anywhere in the line wins
+            for pattern in _ANSWER_LABEL_RES:
+                match = pattern.search(line)
+                if match:
+                    label_answers.setdefault(int(match.group(1)), match.group(2).upper())
+                    break
+        
+        for found in (checkbox_answers, compact_answers, standalone_answers, label_answers):
+            for q_num, answer in found.items():
+                if q_num not in answer_key:
+                    answer_key[q_num] = answer
+        
+        # Pattern 5: Look for answers in question context (if key file has full questions)
+        # Find questions with filled checkboxes in the same context
+        for i, line in enumerate(lines):
+            q_match = _QUESTION_START_RE.search(line)
+            if not q_match:
+                continue
+            q_num = int(q_match.group(1))
+            # Already answered by an earlier pattern
+            if q_num in answer_key:
+                continue
+            # Look ahead in next 10 lines for filled checkbox
+            for j in range(i + 1, min(i + 11, len(lines))):
+                next_line = lines[j].strip()
+                # Check if this is a new question (stop searching)
+                if _QUESTION_START_RE.match(next_line):
+                    break
+                # Look for filled checkbox
+                checkbox_match = _CHECKBOX_RE.search(next_line)
+                if checkbox_match:
+                    answer_key[q_num] = checkbox_match.group(1).upper()
+                    break
+        
+        # Merge yellow highlight results (they take precedence if found)
+        answer_key.update(yellow_answers)
     
     extraction_method = "yellow highlights" if yellow_answers else "text patterns"
     print(f"Extracted {len(answer_key)} answers from key file using {extraction_method}")
@@ -456,7 +505,137 @@ def extract_answer_key_from_pdf(key_path: Path) -> Dict[int, str]:
     return answer_key
 
 
-def extract_answer_key_from_excel(excel_path: Path) -> Dict[int, str]:
+# Cell strings pandas.read_excel reads as missing values; kept so voided answers
+# such as "N/A" are not mistaken for the letter A
+_EXCEL_NA_STRINGS = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+
+def _excel_column_names(header) -> List:
+    """Name header cells the way pandas does (blank -> "Unnamed: i", duplicates -> "name.1")"""
+    columns = []
+    seen = {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _find_excel_key_columns(columns: List):
+    """
+    Find question and answer columns (case-insensitive, flexible naming)
+    Returns (question_col, answer_col), or (None, None) if there are fewer than 2 columns
+    """
+    question_col = None
+    answer_col = None
+    
+    # Try to find columns by name (case-insensitive)
+    for col in columns:
+        col_lower = str(col).lower().strip()
+        if col_lower in ['question', 'questions', 'q', 'q#', 'question #', 'question#', 'num', 'number', '#']:
+            question_col = col
+        elif col_lower in ['answer', 'answers', 'a', 'ans', 'key', 'correct', 'correct answer', 'correct_answer']:
+            answer_col = col
+    
+    # If not found by name, try by position (first column = questions, second = answers)
+    if question_col is None or answer_col is None:
+        if len(columns) >= 2:
+            question_col = columns[0]
+            answer_col = columns[1]
+            print(f"  Using first two columns: '{question_col}' and '{answer_col}'")
+        else:
+            print(f"  Error: Need at least 2 columns, found {len(columns)}")
+            return None, None
+    
+    print(f"  Using columns: Question='{question_col}', Answer='{answer_col}'")
+    return question_col, answer_col
+
+
+def _is_blank_cell(value) -> bool:
+    """None, NaN/NaT, or one of pandas' missing-value strings"""
+    if isinstance(value, str):
+        return value in _EXCEL_NA_STRINGS
+    return value is None or value != value
+
+
+def _parse_excel_key_rows(rows, answer_key: Dict[int, str]):
+    """Add (question cell, answer cell) pairs to answer_key"""
+    for q_val, ans_val in rows:
+        try:
+            # Get question number
+            if _is_blank_cell(q_val):
+                continue
+            
+            # Convert to int (handle float like 1.0 -> 1)
+            if isinstance(q_val, float):
+                q_num = int(q_val)
+            elif isinstance(q_val, str):
+                # Extract number from string if needed
+                num_match = re.search(r'(\d+)', q_val)
+                if num_match:
+                    q_num = int(num_match.group(1))
+                else:
+                    continue
+            else:
+                q_num = int(q_val)
+            
+            # Get answer
+            if _is_blank_cell(ans_val):
+                continue
+            
+            # Convert to string and extract letter
+            ans_str = str(ans_val).strip().upper()
+            
+            # Extract letter (A, B, C, D, E)
+            letter_match = _ANSWER_LETTER_RE.search(ans_str)
+            if letter_match:
+                answer_letter = letter_match.group()
+                if answer_letter in ['A', 'B', 'C', 'D', 'E']:
+                    answer_key[q_num] = answer_letter
+            
+        except (ValueError, KeyError, TypeError) as e:
+            # Skip rows that can't be parsed
+            continue
+
+
+@functools.cache
+def _pandas():
+    """Import pandas the first time a key file needs it"""
+    import pandas
+    return pandas
+
+
+def _parse_excel_key_frame(questions, answers, answer_key: Dict[int, str]):
+    """
+    Column-wise version of _parse_excel_key_rows for pandas Series
+    (pandas already reads "N/A", "NA", ... as NaN, so notna() covers the blank-cell checks)
+    """
+    pd = _pandas()
+    # Numbers are truncated like int(); strings use their first run of digits
+    if pd.api.types.is_numeric_dtype(questions):
+        q_nums = questions.astype(float)
+    else:
+        is_text = questions.map(lambda value: isinstance(value, str))
+        q_nums = pd.to_numeric(questions.where(~is_text), errors='coerce').astype(float)
+        digits = questions[is_text].str.extract(r'(\d+)', expand=False).dropna()
+        if not digits.empty:
+            q_nums.loc[digits.index] = digits.map(int).astype(float)
+    
+    letters = answers.astype(str).str.strip().str.upper().str.extract(r'([A-E])', expand=False)
+    mask = q_nums.notna() & np.isfinite(q_nums) & answers.notna() & letters.notna()
+    for q_num, answer_letter in zip(q_nums[mask], letters[mask]):
+        answer_key[int(q_num)] = answer_letter
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_answer_key_excel(excel_path: Path, mtime_ns: Optional[int], size: Optional[int]) -> Dict[int, str]:
     """
     Extract answer key from Excel file
     Expected format: Columns named "Questions" and "Answers" (or similar)
@@ -465,237 +644,267 @@ def extract_answer_key_from_excel(excel_path: Path) -> Dict[int, str]:
     answer_key = {}
     
     if not EXCEL_AVAILABLE:
-        print("Error: pandas not installed. Cannot read Excel files.")
+        print("Error: openpyxl not installed. Cannot read Excel files.")
         return answer_key
     
     if not excel_path.exists():
         print(f"Error: Excel file not found: {excel_path}")
         return answer_key
     
-    try:
-        # Read Excel file
-        df = pd.read_excel(excel_path)
-        
+    # Read Excel file: read-only openpyxl for .xlsx, pandas for anything else (.xls)
+    if OPENPYXL_AVAILABLE and excel_path.suffix.lower() in ('.xlsx', '.xlsm'):
+        workbook = load_workbook(excel_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            columns = _excel_column_names(next(rows, ()))
+            print(f"Excel file loaded: {excel_path.name}")
+            print(f"  Columns: {columns}")
+            
+            question_col, answer_col = _find_excel_key_columns(columns)
+            if question_col is None:
+                return answer_key
+            q_idx = columns.index(question_col)
+            a_idx = columns.index(answer_col)
+            _parse_excel_key_rows(
+                ((row[q_idx] if q_idx < len(row) else None, row[a_idx] if a_idx < len(row) else None)
+                 for row in rows),
+                answer_key,
+            )
+        finally:
+            workbook.close()
+    elif PANDAS_AVAILABLE:
+        df = _pandas().read_excel(excel_path)
         print(f"Excel file loaded: {excel_path.name}")
         print(f"  Shape: {df.shape}")
         print(f"  Columns: {list(df.columns)}")
         
-        # Find question and answer columns (case-insensitive, flexible naming)
-        question_col = None
-        answer_col = None
-        
-        # Try to find columns by name (case-insensitive)
-        for col in df.columns:
-            col_lower = str(col).lower().strip()
-            if col_lower in ['question', 'questions', 'q', 'q#', 'question #', 'question#', 'num', 'number', '#']:
-                question_col = col
-            elif col_lower in ['answer', 'answers', 'a', 'ans', 'key', 'correct', 'correct answer', 'correct_answer']:
-                answer_col = col
-        
-        # If not found by name, try by position (first column = questions, second = answers)
-        if question_col is None or answer_col is None:
-            if len(df.columns) >= 2:
-                question_col = df.columns[0]
-                answer_col = df.columns[1]
-                print(f"  Using first two columns: '{question_col}' and '{answer_col}'")
-            else:
-                print(f"  Error: Need at least 2 columns, found {len(df.columns)}")
-                return answer_key
-        
-        print(f"  Using columns: Question='{question_col}', Answer='{answer_col}'")
-        
-        # Extract answers
-        for idx, row in df.iterrows():
-            try:
-                # Get question number
-                q_val = row[question_col]
-                if pd.isna(q_val):
-                    continue
-                
-                # Convert to int (handle float like 1.0 -> 1)
-                if isinstance(q_val, float):
-                    q_num = int(q_val)
-                elif isinstance(q_val, str):
-                    # Extract number from string if needed
-                    num_match = re.search(r'(\d+)', q_val)
-                    if num_match:
-                        q_num = int(num_match.group(1))
-                    else:
-                        continue
-                else:
-                    q_num = int(q_val)
-                
-                # Get answer
-                ans_val = row[answer_col]
-                if pd.isna(ans_val):
-                    continue
-                
-                # Convert to string and extract letter
-                ans_str = str(ans_val).strip().upper()
-                
-                # Extract letter (A, B, C, D, E)
-                letter_match = re.search(r'([A-E])', ans_str)
-                if letter_match:
-                    answer_letter = letter_match.group(1)
-                    if answer_letter in ['A', 'B', 'C', 'D', 'E']:
-                        answer_key[q_num] = answer_letter
-                
-            except (ValueError, KeyError, TypeError) as e:
-                # Skip rows that can't be parsed
-                continue
-        
-        print(f"Extracted {len(answer_key)} answers from Excel file")
-        if answer_key:
-            # Show sample from beginning and end to verify all answers
-            sample_start = dict(list(answer_key.items())[:10])
-            sample_end = dict(list(answer_key.items())[-10:])
-            print(f"Sample answers (first 10): {sample_start}")
-            print(f"Sample answers (last 10): {sample_end}")
-            # Verify we have all expected questions
-            if len(answer_key) > 0:
-                min_q = min(answer_key.keys())
-                max_q = max(answer_key.keys())
-                expected_count = max_q - min_q + 1
-                if len(answer_key) != expected_count:
-                    missing = [i for i in range(min_q, max_q + 1) if i not in answer_key]
-                    print(f"  Warning: Missing question numbers: {missing}")
-                else:
-                    print(f"  Verified: All questions from {min_q} to {max_q} are present ({len(answer_key)} total)")
-        
-    except Exception as e:
-        print(f"Error reading Excel file: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        question_col, answer_col = _find_excel_key_columns(list(df.columns))
+        if question_col is None:
+            return answer_key
+        _parse_excel_key_frame(df[question_col], df[answer_col], answer_key)
+    else:
+        print(f"Error: pandas not installed. Cannot read {excel_path.suffix} files.")
         return answer_key
     
+    print(f"Extracted {len(answer_key)} answers from Excel file")
+    if answer_key:
+        # Show sample from beginning and end to verify all answers
+        sample_start = dict(list(answer_key.items())[:10])
+        sample_end = dict(list(answer_key.items())[-10:])
+        print(f"Sample answers (first 10): {sample_start}")
+        print(f"Sample answers (last 10): {sample_end}")
+        # Verify we have all expected questions
+        if len(answer_key) > 0:
+            min_q = min(answer_key.keys())
+            max_q = max(answer_key.keys())
+            expected_count = max_q - min_q + 1
+            if len(answer_key) != expected_count:
+                missing = [i for i in range(min_q, max_q + 1) if i not in answer_key]
+                print(f"  Warning: Missing question numbers: {missing}")
+            else:
+                print(f"  Verified: All questions from {min_q} to {max_q} are present ({len(answer_key)} total)")
+    
     return answer_key
 
 
+# Parsed files are cached keyed by (path, mtime, size), so an edited or replaced
+# file is parsed again. Cached results are shared between requests: do not modify them.
+# The parsers raise on read errors so a failed read is never cached and is retried
+# on the next request.
+def _file_signature(path: Path):
+    """Return (mtime_ns, size) of a file, or (None, None) if it cannot be read"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None, None
+    return st.st_mtime_ns, st.st_size
+
+
+def extract_questions_from_pdf(pdf_path: Path) -> List[Question]:
+    """Extract questions from a test PDF (cached until the file changes)"""
+    pdf_path = Path(pdf_path)
+    return _parse_questions(pdf_path, *_file_signature(pdf_path))
+
+
+def extract_answer_key_from_pdf(key_path: Path) -> Dict[int, str]:
+    """Extract the answer key from a key PDF (cached until the file changes)"""
+    key_path = Path(key_path)
+    try:
+        return _parse_answer_key_pdf(key_path, *_file_signature(key_path))
+    except Exception:
+        logger.warning("Error reading key PDF %s", key_path.name, exc_info=True)
+        return {}
+
+
+def extract_answer_key_from_excel(excel_path: Path) -> Dict[int, str]:
+    """Extract the answer key from an Excel file (cached until the file changes)"""
+    excel_path = Path(excel_path)
+    try:
+        return _parse_answer_key_excel(excel_path, *_file_signature(excel_path))
+    except Exception:
+        logger.warning("Error reading Excel file %s", excel_path.name, exc_info=True)
+        return {}
+
+
+# mkstemp creates files readable by the owner only; saved pages get the usual
+# umask-based mode instead. os.umask can only be read by setting it, so this is
+# done once at import rather than from the worker threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_SAVED_FILE_MODE = 0o666 & ~_UMASK
+
+
+def _dump_stream(html_stream, output_path: Path):
+    """
+    Write a template stream to output_path as UTF-8, chunk by chunk
+    Rendering goes to a temporary file in the same directory that replaces the
+    target only on success, so a failed render never leaves a truncated page
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            html_stream.dump(f, encoding='utf-8')
+        os.chmod(tmp_path, _SAVED_FILE_MODE)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def save_answer_key_html(key_path: Path, answer_key: Dict[int, str], output_path: Path):
     """
     Save answer key as a clean HTML file
     """
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Answer Key: {key_path.name}</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            max-width: 600px;
-            margin: 40px auto;
-            padding: 20px;
-            background: #f5f5f5;
-        }}
-        .container {{
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #333;
-            margin-bottom: 10px;
-        }}
-        .source-file {{
-            color: #666;
-            margin-bottom: 30px;
-            font-size: 14px;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }}
-        thead {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-        }}
-        th {{
-            padding: 12px;
-            text-align: left;
-            font-weight: 600;
-        }}
-        td {{
-            padding: 10px 12px;
-            border-bottom: 1px solid #e9ecef;
-        }}
-        tbody tr:hover {{
-            background: #f8f9fa;
-        }}
-        .question-num {{
-            font-weight: 600;
-            color: #667eea;
-        }}
-        .answer {{
-            font-weight: 600;
-            color: #28a745;
-            font-size: 18px;
-        }}
-        .stats {{
-            margin-top: 20px;
-            padding: 15px;
-            background: #e7f3ff;
-            border-radius: 5px;
-            color: #0c5460;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Answer Key</h1>
-        <p class="source-file">Source: {key_path.name}</p>
-        
-        <div class="stats">
-            <strong>Total Answers:</strong> {len(answer_key)}
-        </div>
-        
-        <table>
-            <thead>
-                <tr>
-                    <th>Question #</th>
-                    <th>Correct Answer</th>
-                </tr>
-            </thead>
-            <tbody>
-"""
-    
-    # Sort by question number
-    sorted_answers = sorted(answer_key.items(), key=lambda x: x[0])
-    
-    for question_num, answer in sorted_answers:
-        html_content += f"""
-                <tr>
-                    <td class="question-num">{question_num}</td>
-                    <td class="answer">{answer}</td>
-                </tr>
-"""
-    
-    html_content += """
-            </tbody>
-        </table>
-    </div>
-</body>
-</html>
-"""
+    html_stream = _template("answer_key.html").stream(
+        source=key_path.name,
+        total=len(answer_key),
+        # Sort by question number
+        answers=sorted(answer_key.items(), key=lambda x: x[0]),
+    )
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        # Write the rendered chunks as they are produced instead of one big string
+        _dump_stream(html_stream, output_path)
         print(f"Answer key saved to: {output_path}")
     except Exception as e:
         print(f"Error saving answer key HTML: {str(e)}")
 
 
+@functools.lru_cache(maxsize=4)
+def _scan_key_dir(key_dir: Path, mtime_ns: int) -> Dict[str, Path]:
+    """Files in a key directory by lowercased name (cached until the directory changes)"""
+    with os.scandir(key_dir) as entries:
+        return {entry.name.lower(): Path(entry.path) for entry in entries if entry.is_file()}
+
+
+def _key_dir_index() -> Dict[str, Path]:
+    """Lowercased file name -> path for everything in KEY_DIR"""
+    return _scan_key_dir(KEY_DIR, KEY_DIR.stat().st_mtime_ns)
+
+
+# Lowercases ASCII letters and drops underscores in one pass
+_NORM_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase, '_')
+
+# Key-related words that mark a file as an answer key
+_KEY_WORD_RE = re.compile(r'key|answer|anser')
+
+# Key-related words stripped from key stems before similarity matching (including
+# typo variants). They overlap, so they are removed one after another in this order
+_KEY_STRIP_WORDS = ('_key', '_answerkey', '_anserkey', '_answer_key', '_answer', '_answers',
+                    '_letter', 'key_', 'answerkey', 'anserkey', 'answer_key')
+
+
+def _strip_key_suffixes(stem_lower: str) -> str:
+    """
+    Remove the key-related words from a lowercased key stem
+
+    >>> _strip_key_suffixes('2003_openexam_anserkey')
+    '2003_openexam'
+    >>> _strip_key_suffixes('key_answerkey')
+    'key'
+    >>> _strip_key_suffixes('answerkey_2004')
+    'answer2004'
+    >>> _strip_key_suffixes('xkey_letter')
+    'xkey'
+    """
+    for word in _KEY_STRIP_WORDS:
+        stem_lower = stem_lower.replace(word, '')
+    return stem_lower
+
+
+@functools.lru_cache(maxsize=4)
+def _scan_key_names(key_dir: Path, mtime_ns: int, excel_available: bool) -> tuple:
+    """
+    (path, lowercased stem, stem without underscores, stem without key suffixes)
+    for each key file, Excel first, then PDF, without temporary Excel files
+    """
+    extensions = ['.xlsx', '.xls', '.pdf'] if excel_available else ['.pdf']
+    key_files = _scan_key_dir(key_dir, mtime_ns).values()
+    names = []
+    for ext in extensions:
+        for k in key_files:
+            if k.suffix.lower() != ext or k.name.startswith('~$'):
+                continue
+            stem_lower = k.stem.lower()
+            # Remove common key-related suffixes for comparison
+            key_base = _strip_key_suffixes(stem_lower)
+            names.append((k, stem_lower, k.stem.translate(_NORM_TABLE), key_base))
+    return tuple(names)
+
+
+def _key_file_names() -> tuple:
+    """Precomputed comparison names for the key files in KEY_DIR"""
+    return _scan_key_names(KEY_DIR, KEY_DIR.stat().st_mtime_ns, EXCEL_AVAILABLE)
+
+
+def _available_key_files() -> List[Path]:
+    """Key files in KEY_DIR (Excel first, then PDF), without temporary Excel files"""
+    return [names[0] for names in _key_file_names()]
+
+
+def _name_similarity(a: str, b: str, floor: float = 0.0) -> float:
+    """
+    difflib similarity of two file names between 0 and 1, or 0.0 if it cannot exceed floor
+    rapidfuzz's Indel ratio (2 * LCS / total length) is an upper bound on
+    SequenceMatcher.ratio(), so when installed it only rules out candidates early;
+    the scores, and so the chosen key file, are the same with or without it
+    """
+    if RAPIDFUZZ_AVAILABLE and a and b and _fuzz_ratio(a, b) / 100 < floor - 1e-9:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+# Canonical lowercased key file suffixes, most specific first
+_KEY_SUFFIXES = ("_key", "_answerkey", "_answer_key", "_anserkey", "_anserkey_letter", "_answerkey_letter")
+_YEAR_KEY_SUFFIXES = ("_openexam_anserkey", "_openexam_answerkey", "_openexam_key")
+
+
+def _iter_key_candidates(test_stem: str, test_base: str, test_year: Optional[str]):
+    """
+    Lowercased candidate key file names for a test, most specific first
+    Generated lazily so a hit on an early pattern skips formatting the rest
+    """
+    # Excel files are preferred over PDF files
+    extensions = (".xlsx", ".xls", ".pdf") if EXCEL_AVAILABLE else (".pdf",)
+    # Full stem first, then the base without exam suffixes
+    for stem in (test_stem.lower(), test_base):
+        for ext in extensions:
+            for suffix in _KEY_SUFFIXES:
+                yield stem + suffix + ext
+        yield f"key_{stem}.pdf"
+    
+    # If we have a year, try year-based patterns
+    if test_year:
+        for ext in extensions:
+            for suffix in _YEAR_KEY_SUFFIXES:
+                yield test_year + suffix + ext
+
+
 def find_matching_key_file(test_filename: str) -> Optional[Path]:
     """
     Find matching key file for a test file using name similarity
     Tries various naming conventions and uses similarity matching
     """
-    from difflib import SequenceMatcher
-    
     test_stem = Path(test_filename).stem
     test_stem_lower = test_stem.lower()
     # Extract year prefix (e.g., "2003" from "2003_OpenExam")
@@ -705,210 +914,88 @@ def find_matching_key_file(test_filename: str) -> Optional[Path]:
     test_base = test_stem_lower.replace('_test', '').replace('_exam', '').replace('_openexam', '').replace('openexam', '')
     
     if not KEY_DIR.exists():
-        print(f"ERROR: Key directory does not exist: {KEY_DIR}")
+        logger.error("Key directory does not exist: %s", KEY_DIR)
         return None
     
-    print(f"Searching for key file matching: {test_filename}")
-    print(f"  Test stem: {test_stem}")
-    print(f"  Test base: {test_base}")
+    logger.debug("Searching for key file matching: %s (stem: %s, base: %s)", test_filename, test_stem, test_base)
     
     # Try exact match patterns first (case-insensitive)
     # Prioritize Excel files over PDF files
-    patterns = []
-    
-    # Excel file patterns (preferred)
-    if EXCEL_AVAILABLE:
-        patterns.extend([
-            f"{test_stem}_key.xlsx",
-            f"{test_stem}_Key.xlsx",
-            f"{test_stem}_KEY.xlsx",
-            f"{test_stem}_answerkey.xlsx",
-            f"{test_stem}_AnswerKey.xlsx",
-            f"{test_stem}_ANSWERKEY.xlsx",
-            f"{test_stem}_answer_key.xlsx",
-            f"{test_stem}_Answer_Key.xlsx",
-            f"{test_stem}_AnserKey.xlsx",  # Handle typo: AnserKey instead of AnswerKey
-            f"{test_stem}_AnserKey_Letter.xlsx",
-            f"{test_stem}_answerkey_letter.xlsx",
-            f"{test_stem}_AnswerKey_Letter.xlsx",
-            f"{test_stem}_key.xls",
-            f"{test_stem}_AnserKey.xls",
-            f"{test_stem}_AnswerKey.xls",
-        ])
-    
-    # PDF file patterns (fallback)
-    patterns.extend([
-        f"{test_stem}_key.pdf",
-        f"{test_stem}_Key.pdf",
-        f"{test_stem}_KEY.pdf",
-        f"{test_stem}_answerkey.pdf",
-        f"{test_stem}_AnswerKey.pdf",
-        f"{test_stem}_ANSWERKEY.pdf",
-        f"{test_stem}_answer_key.pdf",
-        f"{test_stem}_Answer_Key.pdf",
-        f"{test_stem}_AnserKey.pdf",  # Handle typo: AnserKey instead of AnswerKey
-        f"{test_stem}_AnserKey_Letter.pdf",  # Handle specific format with typo
-        f"{test_stem}_answerkey_letter.pdf",
-        f"{test_stem}_AnswerKey_Letter.pdf",
-        f"key_{test_stem}.pdf",
-        f"Key_{test_stem}.pdf",
-    ])
-    
-    # Base patterns (without full stem)
-    if EXCEL_AVAILABLE:
-        patterns.extend([
-            f"{test_base}_key.xlsx",
-            f"{test_base}_AnserKey.xlsx",
-            f"{test_base}_AnswerKey.xlsx",
-        ])
-    patterns.extend([
-        f"{test_base}_key.pdf",
-        f"{test_base}_Key.pdf",
-        f"{test_base}_answerkey.pdf",
-        f"{test_base}_AnswerKey.pdf",
-        f"{test_base}_AnserKey.pdf",  # Handle typo
-        f"{test_base}_AnserKey_Letter.pdf",  # Handle specific format with typo
-        f"{test_base}_answer_key.pdf",
-        f"key_{test_base}.pdf",
-    ])
+    # One directory read; names are matched case-insensitively, as on Windows
+    key_files = _key_dir_index()
     
-    # If we have a year, try year-based patterns
-    if test_year:
-        if EXCEL_AVAILABLE:
-            patterns.extend([
-                f"{test_year}_OpenExam_AnserKey.xlsx",
-                f"{test_year}_OpenExam_AnswerKey.xlsx",
-                f"{test_year}_OpenExam_key.xlsx",
-                f"{test_year}_OpenExam_Key.xlsx",
-            ])
-        patterns.extend([
-            f"{test_year}_OpenExam_AnserKey.pdf",
-            f"{test_year}_OpenExam_AnswerKey.pdf",
-            f"{test_year}_OpenExam_key.pdf",
-            f"{test_year}_OpenExam_Key.pdf",
-            f"{test_year}_openexam_anserkey.pdf",
-            f"{test_year}_openexam_answerkey.pdf",
-        ])
-    
-    # Also try with original case preserved
-    if EXCEL_AVAILABLE:
-        patterns.extend([
-            f"{test_stem}_AnserKey_Letter.xlsx",
-            f"{test_stem}_AnswerKey_Letter.xlsx",
-        ])
-    patterns.extend([
-        f"{test_stem}_AnserKey_Letter.pdf",
-        f"{test_stem}_AnswerKey_Letter.pdf",
-    ])
-    
-    for pattern in patterns:
-        key_file = KEY_DIR / pattern
-        if key_file.exists():
-            print(f"  [OK] Found exact match: {key_file.name}")
+    for pattern in _iter_key_candidates(test_stem, test_base, test_year):
+        key_file = key_files.get(pattern)
+        if key_file:
+            logger.debug("Found exact match: %s", key_file.name)
             return key_file
     
     # Try case-insensitive matching - improved to match by year/prefix
-    test_stem_normalized = test_stem.replace('_', '').lower()
+    test_stem_normalized = test_stem.translate(_NORM_TABLE)
     # Extract year from test filename for better matching
     test_year_normalized = test_year.lower() if test_year else None
     
-    # Search for Excel files first (preferred), then PDF files
-    file_extensions = []
-    if EXCEL_AVAILABLE:
-        file_extensions.extend(['*.xlsx', '*.xls'])
-    file_extensions.append('*.pdf')
-    
-    for ext in file_extensions:
-        for key_file in KEY_DIR.glob(ext):
-            # Skip temporary Excel files (starting with ~$)
-            if key_file.name.startswith('~$'):
-                continue
-                
-            key_stem_normalized = key_file.stem.replace('_', '').lower()
-            key_stem_lower = key_file.stem.lower()
-            
-            # Check if it contains key-related words
-            has_key_word = any(word in key_stem_lower for word in ['key', 'answer', 'anser'])
-            
-            # Match by year if available
-            if test_year_normalized and test_year_normalized in key_stem_normalized:
-                if has_key_word:
-                    print(f"  [OK] Found year-based match: {key_file.name}")
-                    return key_file
-            
-            # Match by stem similarity
-            if test_stem_normalized in key_stem_normalized or key_stem_normalized in test_stem_normalized:
-                if has_key_word:
-                    print(f"  [OK] Found case-insensitive match: {key_file.name}")
-                    return key_file
-    
-    # Try just "key" or "Key" (single key file)
-    if EXCEL_AVAILABLE:
-        key_file = KEY_DIR / "key.xlsx"
-        if key_file.exists():
+    # Search for Excel files first (preferred), then PDF files; a containment
+    # hit here returns before the similarity pass below ever runs
+    key_names = _key_file_names()
+    for key_file, key_stem_lower, key_stem_normalized, _ in key_names:
+        # Only files with key-related words can match here
+        if not _KEY_WORD_RE.search(key_stem_lower):
+            continue
+        
+        # Match by year if available
+        if test_year_normalized and test_year_normalized in key_stem_normalized:
+            logger.debug("Found year-based match: %s", key_file.name)
             return key_file
-        key_file = KEY_DIR / "Key.xlsx"
-        if key_file.exists():
+        
+        # Match by stem similarity
+        if test_stem_normalized in key_stem_normalized or key_stem_normalized in test_stem_normalized:
+            logger.debug("Found case-insensitive match: %s", key_file.name)
             return key_file
     
-    key_file = KEY_DIR / "key.pdf"
-    if key_file.exists():
-        return key_file
+    # Try just "key" or "Key" (single key file)
+    if EXCEL_AVAILABLE and "key.xlsx" in key_files:
+        return key_files["key.xlsx"]
     
-    key_file = KEY_DIR / "Key.pdf"
-    if key_file.exists():
-        return key_file
+    if "key.pdf" in key_files:
+        return key_files["key.pdf"]
     
     # Use similarity matching to find best match
     best_match = None
     best_ratio = 0.0
     
     # Collect all available key files (Excel and PDF)
-    available_keys = []
-    if EXCEL_AVAILABLE:
-        available_keys.extend(KEY_DIR.glob("*.xlsx"))
-        available_keys.extend(KEY_DIR.glob("*.xls"))
-    available_keys.extend(KEY_DIR.glob("*.pdf"))
-    # Filter out temporary Excel files
-    available_keys = [k for k in available_keys if not k.name.startswith('~$')]
-    
-    print(f"  Available key files: {[k.name for k in available_keys]}")
-    
-    for key_file in available_keys:
-        key_stem = key_file.stem
-        key_stem_lower = key_stem.lower()
-        # Remove common key-related suffixes for comparison (including typo variants)
-        key_base = key_stem_lower.replace('_key', '').replace('_answerkey', '').replace('_anserkey', '').replace('_answer_key', '').replace('_answer', '').replace('_answers', '').replace('_letter', '').replace('key_', '').replace('answerkey', '').replace('anserkey', '').replace('answer_key', '')
-        
-        # Calculate similarity ratios
-        ratio1 = SequenceMatcher(None, test_stem_lower, key_stem_lower).ratio()
-        ratio2 = SequenceMatcher(None, test_base, key_base).ratio()
-        ratio3 = SequenceMatcher(None, test_stem_lower, key_base).ratio()
-        ratio4 = SequenceMatcher(None, test_base, key_stem_lower).ratio()
-        
-        # Use the best ratio
-        max_ratio = max(ratio1, ratio2, ratio3, ratio4)
-        
-        # Also check if one contains the other (partial match)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Available key files: %s", [names[0].name for names in key_names])
+    
+    for key_file, key_stem_lower, key_stem_normalized, key_base in key_names:
+        max_ratio = 0.0
+        # Check if one contains the other (partial match)
         if test_stem_lower in key_stem_lower or key_stem_lower in test_stem_lower:
             max_ratio = max(max_ratio, 0.7)  # Boost partial matches
         if test_base in key_base or key_base in test_base:
             max_ratio = max(max_ratio, 0.7)
         
         # Boost if test filename appears in key filename
-        if test_stem_lower.replace('_', '') in key_stem_lower.replace('_', ''):
+        if test_stem_normalized in key_stem_normalized:
             max_ratio = max(max_ratio, 0.8)
         
+        # Use the best of the boosts and the similarity ratios; a ratio only
+        # matters if it beats both this file's score so far and the best match
+        for a, b in ((test_stem_lower, key_stem_lower), (test_base, key_base),
+                     (test_stem_lower, key_base), (test_base, key_stem_lower)):
+            max_ratio = max(max_ratio, _name_similarity(a, b, max(max_ratio, best_ratio)))
+        
         if max_ratio > best_ratio:
             best_ratio = max_ratio
             best_match = key_file
     
     # Return best match if similarity is above threshold
     if best_match and best_ratio >= 0.3:  # Lowered threshold to be more permissive
-        print(f"  [OK] Found similarity match: {best_match.name} (ratio: {best_ratio:.2f})")
+        logger.debug("Found similarity match: %s (ratio: %.2f)", best_match.name, best_ratio)
         return best_match
     
-    print(f"  [FAIL] No matching key file found (best ratio: {best_ratio:.2f})")
+    logger.debug("No matching key file found (best ratio: %.2f)", best_ratio)
     return None
 
 
@@ -918,82 +1005,56 @@ def calculate_score(user_answers: Dict[str, str], answer_key: Dict[int, str], qu
     Returns a dictionary with score details
     """
     total_questions = len(questions)
-    correct = 0
-    incorrect = 0
-    unanswered = 0
+    # Aligned per-question lists of the user's answers and the key's answers
+    user_list = [user_answers.get(str(q.number), "").strip() for q in questions]
+    key_list = [answer_key.get(q.number, "") for q in questions]
+    statuses = []
     results = {}
     
-    for q in questions:
-        question_num = q.number
-        user_answer = user_answers.get(str(question_num), "").strip()
-        correct_answer = answer_key.get(question_num, "")
-        
+    for q, user_answer, correct_answer in zip(questions, user_list, key_list):
         if not user_answer:
-            unanswered += 1
-            results[question_num] = {
+            status = "unanswered"
+            results[q.number] = {
                 "correct": False,
                 "user_answer": "No answer",
                 "correct_answer": correct_answer if correct_answer else "Unknown",
-                "status": "unanswered"
+                "status": status
             }
         elif correct_answer:
             # For multiple choice, compare answer letters
             if q.type == "multiple_choice":
-                # User answer is now just the letter (A, B, C, D, E)
-                user_letter = user_answer.strip().upper()
-                
-                # Validate it's a valid letter
-                if user_letter not in ['A', 'B', 'C', 'D', 'E']:
-                    # Fallback: try to extract letter if format is unexpected
-                    letter_match = re.search(r'^([A-E])', user_answer, re.IGNORECASE)
-                    if letter_match:
-                        user_letter = letter_match.group(1).upper()
-                    else:
-                        user_letter = None
-                
-                if user_letter and user_letter == correct_answer.upper():
-                    correct += 1
-                    results[question_num] = {
-                        "correct": True,
-                        "user_answer": user_letter,
-                        "correct_answer": correct_answer,
-                        "status": "correct"
-                    }
-                else:
-                    incorrect += 1
-                    results[question_num] = {
-                        "correct": False,
-                        "user_answer": user_letter if user_letter else user_answer,
-                        "correct_answer": correct_answer,
-                        "status": "incorrect"
-                    }
+                # User answer is now just the letter (A, B, C, D, E); if the
+                # format is unexpected, fall back to its leading letter
+                user_letter = user_answer[:1].upper()
+                if user_letter not in ('A', 'B', 'C', 'D', 'E'):
+                    user_letter = None
+                is_correct = user_letter is not None and user_letter == correct_answer.upper()
+                shown_answer = user_letter if user_letter else user_answer
             else:
                 # For short answer, do fuzzy matching
-                if user_answer.lower().strip() == correct_answer.lower().strip():
-                    correct += 1
-                    results[question_num] = {
-                        "correct": True,
-                        "user_answer": user_answer,
-                        "correct_answer": correct_answer,
-                        "status": "correct"
-                    }
-                else:
-                    incorrect += 1
-                    results[question_num] = {
-                        "correct": False,
-                        "user_answer": user_answer,
-                        "correct_answer": correct_answer,
-                        "status": "incorrect"
-                    }
+                is_correct = user_answer.lower() == correct_answer.lower().strip()
+                shown_answer = user_answer
+            status = "correct" if is_correct else "incorrect"
+            results[q.number] = {
+                "correct": is_correct,
+                "user_answer": shown_answer,
+                "correct_answer": correct_answer,
+                "status": status
+            }
         else:
             # No answer key for this question
-            results[question_num] = {
+            status = "no_key"
+            results[q.number] = {
                 "correct": None,
                 "user_answer": user_answer,
                 "correct_answer": "No key available",
-                "status": "no_key"
+                "status": status
             }
+        statuses.append(status)
     
+    correct = statuses.count("correct")
+    incorrect = statuses.count("incorrect")
+    unanswered = statuses.count("unanswered")
     score_percentage = (correct / total_questions * 100) if total_questions > 0 else 0
     
     return {
@@ -1006,16 +1067,50 @@ def calculate_score(user_answers: Dict[str, str], answer_key: Dict[int, str], qu
     }
 
 
+def _warm_test_file(pdf_path: Path):
+    """Parse a test PDF and its answer key into the parse caches"""
+    try:
+        extract_questions_from_pdf(pdf_path)
+        key_path = find_matching_key_file(pdf_path.name)
+        if key_path:
+            if key_path.suffix.lower() in ['.xlsx', '.xls']:
+                extract_answer_key_from_excel(key_path)
+            else:
+                extract_answer_key_from_pdf(key_path)
+    except Exception:
+        logger.warning("Could not pre-load %s", pdf_path.name, exc_info=True)
+
+
+def warm_parse_cache():
+    """Parse every test in TEST_DIR (and its key) on a small thread pool"""
+    if not TEST_DIR.exists():
+        return
+    pdf_paths = list(TEST_DIR.glob("*.pdf"))
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+        list(executor.map(_warm_test_file, pdf_paths))
+
+
+@app.on_event("startup")
+async def start_parse_cache_warmup():
+    """Pre-load parsed tests in the background so startup is not delayed"""
+    threading.Thread(target=warm_parse_cache, daemon=True).start()
+
+
+def _list_test_pdfs() -> List[Dict[str, str]]:
+    """Name and path of each PDF in TEST_DIR"""
+    try:
+        with os.scandir(TEST_DIR) as entries:
+            return [{"name": entry.name, "path": entry.path}
+                    for entry in entries if entry.name.endswith(".pdf") and entry.is_file()]
+    except OSError:
+        # Missing or unreadable test directory
+        return []
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Home page - list available PDF tests"""
-    pdf_files = []
-    if TEST_DIR.exists():
-        for pdf_file in TEST_DIR.glob("*.pdf"):
-            pdf_files.append({
-                "name": pdf_file.name,
-                "path": str(pdf_file)
-            })
+    pdf_files = await asyncio.to_thread(_list_test_pdfs)
     
     return templates.TemplateResponse("index.html", {
         "request": request,
@@ -1031,36 +1126,32 @@ async def view_results(request: Request, answer_filename: str):
     if not answer_path.exists():
         raise HTTPException(status_code=404, detail="Results file not found")
     
-    try:
-        with open(answer_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        return HTMLResponse(content=html_content)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading results file: {str(e)}")
+    # Sent straight from disk rather than read into memory first
+    return FileResponse(answer_path, media_type="text/html; charset=utf-8")
 
 
 @app.get("/test/{pdf_name}", response_class=HTMLResponse)
 async def show_test(request: Request, pdf_name: str):
     """Display test questions from PDF"""
     pdf_path = TEST_DIR / pdf_name
-    
-    if not pdf_path.exists():
+    # One stat both checks the file and keys the parse cache
+    mtime_ns, size = _file_signature(pdf_path)
+    if mtime_ns is None:
         raise HTTPException(status_code=404, detail="PDF file not found")
     
     try:
-        questions = extract_questions_from_pdf(pdf_path)
-        print(f"Extracted {len(questions)} questions")  # Debug
+        questions = await asyncio.to_thread(_parse_questions, pdf_path, mtime_ns, size)
+        logger.debug("Extracted %d questions", len(questions))
         # Debug: Print question details for first 3 questions
-        for q in questions[:3]:
-            print(f"  Q{q.number}: {q.type} - {len(q.choices)} choices")
-            print(f"    Text: {q.text[:100]}..." if len(q.text) > 100 else f"    Text: {q.text}")
-            if q.choices:
-                for i, choice in enumerate(q.choices[:4]):
-                    print(f"    {['A','B','C','D','E'][i]}. {choice[:60]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            for q in questions[:3]:
+                logger.debug("  Q%s: %s - %d choices", q.number, q.type, len(q.choices))
+                logger.debug("    Text: %s", f"{q.text[:100]}..." if len(q.text) > 100 else q.text)
+                if q.choices:
+                    for i, choice in enumerate(q.choices[:4]):
+                        logger.debug("    %s. %s...", 'ABCDE'[i], choice[:60])
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error processing PDF: {error_details}")  # Debug output
+        logger.exception("Error processing PDF")
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
     
     # Convert questions to dict for template
@@ -1074,9 +1165,7 @@ async def show_test(request: Request, pdf_name: str):
                 "choices": q.choices or []
             })
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error converting questions: {error_details}")
+        logger.exception("Error converting questions")
         raise HTTPException(status_code=500, detail=f"Error preparing questions: {str(e)}")
     
     try:
@@ -1086,12 +1175,40 @@ async def show_test(request: Request, pdf_name: str):
             "questions": questions_data
         })
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Error rendering template: {error_details}")
+        logger.exception("Error rendering template")
         raise HTTPException(status_code=500, detail=f"Error rendering template: {str(e)}")
 
 
+# Badge text and CSS classes of answer statuses on the results page
+_STATUS_LABELS = {
+    'correct': '✓ Correct',
+    'incorrect': '✗ Incorrect',
+    'unanswered': '? Unanswered',
+    'no_key': ''
+}
+_STATUS_CLASSES = frozenset(('correct', 'incorrect', 'unanswered'))
+_ANSWER_LETTERS = frozenset('ABCDE')
+
+
+def _write_results_page(answer_path: Path, **context):
+    """Render the results page into the answer file"""
+    _dump_stream(_template("results.html").stream(**context), answer_path)
+
+
+def format_answer(question_num, answer: str) -> str:
+    """Format answer for display: "3 B" -> "3. B." """
+    if answer:
+        answer_upper = answer.upper()
+        # Usual case: the answer is just the letter
+        if len(answer) == 1 and 'A' <= answer_upper <= 'E':
+            return f"{question_num}. {answer_upper}."
+        # Otherwise use the first letter, so "b) mitosis" also shows as "B"
+        for ch in answer_upper:
+            if ch in _ANSWER_LETTERS:
+                return f"{question_num}. {ch}."
+    return f"{question_num}. {answer}"
+
+
 @app.post("/submit/{pdf_name}")
 async def submit_answers(pdf_name: str, request: Request):
     """Save user answers, calculate score, and display results"""
@@ -1106,280 +1223,90 @@ async def submit_answers(pdf_name: str, request: Request):
     
     # Get questions from the test PDF
     pdf_path = TEST_DIR / pdf_name
-    if not pdf_path.exists():
+    mtime_ns, size = _file_signature(pdf_path)
+    if mtime_ns is None:
         raise HTTPException(status_code=404, detail="PDF file not found")
     
     try:
-        questions = extract_questions_from_pdf(pdf_path)
+        # Already parsed when the test was shown, so this is normally a cache hit
+        questions = await asyncio.to_thread(_parse_questions, pdf_path, mtime_ns, size)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
     
     # Try to find and load answer key from KEY_DIR
-    print(f"\n{'='*70}")
-    print(f"Processing submission for: {pdf_name}")
-    print(f"{'='*70}")
-    print(f"Looking for answer key in: {KEY_DIR}")
+    logger.info("Processing submission for: %s", pdf_name)
+    logger.debug("Looking for answer key in: %s", KEY_DIR)
     
     # List all available key files for debugging
-    if KEY_DIR.exists():
-        available_keys = []
-        if EXCEL_AVAILABLE:
-            available_keys.extend(KEY_DIR.glob("*.xlsx"))
-            available_keys.extend(KEY_DIR.glob("*.xls"))
-        available_keys.extend(KEY_DIR.glob("*.pdf"))
-        # Filter out temporary Excel files
-        available_keys = [k for k in available_keys if not k.name.startswith('~$')]
-        print(f"Available key files ({len(available_keys)}):")
-        for k in available_keys:
-            print(f"  - {k.name}")
-    else:
-        print(f"ERROR: Key directory does not exist: {KEY_DIR}")
+    if logger.isEnabledFor(logging.DEBUG) and KEY_DIR.exists():
+        available_keys = _available_key_files()
+        logger.debug("Available key files (%d): %s", len(available_keys), [k.name for k in available_keys])
     
-    key_path = find_matching_key_file(pdf_name)
+    key_path = await asyncio.to_thread(find_matching_key_file, pdf_name)
     answer_key = {}
     key_found = False
     
     if key_path and key_path.exists():
-        print(f"\n[OK] Found matching key file: {key_path.name}")
-        print(f"  Full path: {key_path}")
-        print(f"  File type: {'Excel' if key_path.suffix.lower() in ['.xlsx', '.xls'] else 'PDF'}")
+        logger.info("Found matching key file: %s", key_path)
         try:
             # Determine file type and extract accordingly
             if key_path.suffix.lower() in ['.xlsx', '.xls']:
                 if not EXCEL_AVAILABLE:
-                    print(f"  [ERROR] Excel support not available. Install pandas: pip install pandas openpyxl")
+                    logger.error("Excel support not available. Install openpyxl: pip install openpyxl")
                     key_found = False
                 else:
-                    answer_key = extract_answer_key_from_excel(key_path)
+                    answer_key = await asyncio.to_thread(extract_answer_key_from_excel, key_path)
                     key_found = len(answer_key) > 0
-                    print(f"[OK] Extracted {len(answer_key)} answers from Excel file")
                     if answer_key:
-                        print(f"  Sample answers: {dict(list(answer_key.items())[:5])}")
+                        logger.info("Extracted %d answers from Excel file", len(answer_key))
                     else:
-                        print(f"  [WARN] No answers extracted from Excel file. Check file format.")
+                        logger.warning("No answers extracted from Excel file. Check file format.")
             else:
                 # PDF file
-                answer_key = extract_answer_key_from_pdf(key_path)
+                answer_key = await asyncio.to_thread(extract_answer_key_from_pdf, key_path)
                 key_found = len(answer_key) > 0
-                print(f"[OK] Extracted {len(answer_key)} answers from PDF file")
                 if answer_key:
-                    print(f"  Sample answers: {dict(list(answer_key.items())[:5])}")
+                    logger.info("Extracted %d answers from PDF file", len(answer_key))
                 else:
-                    print(f"  [WARN] No answers extracted from PDF file. Check PDF format.")
+                    logger.warning("No answers extracted from PDF file. Check PDF format.")
         except Exception as e:
-            print(f"  [ERROR] Error extracting answers: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error extracting answers: %s", e)
             key_found = False
         
         # Save answer key as HTML file
         if key_found:
             try:
                 key_html_path = ANSWER_DIR / f"{Path(pdf_name).stem}_answer_key.html"
-                save_answer_key_html(key_path, answer_key, key_html_path)
-                print(f"[OK] Answer key HTML saved to: {key_html_path}")
+                await asyncio.to_thread(save_answer_key_html, key_path, answer_key, key_html_path)
+                logger.debug("Answer key HTML saved to: %s", key_html_path)
             except Exception as e:
-                print(f"  [WARN] Could not save answer key HTML: {e}")
+                logger.warning("Could not save answer key HTML: %s", e)
     else:
-        print(f"\n[FAIL] No matching key file found for: {pdf_name}")
-        print(f"  Searched in: {KEY_DIR}")
-        if KEY_DIR.exists():
-            available_keys = []
-            if EXCEL_AVAILABLE:
-                available_keys.extend(KEY_DIR.glob("*.xlsx"))
-                available_keys.extend(KEY_DIR.glob("*.xls"))
-            available_keys.extend(KEY_DIR.glob("*.pdf"))
-            available_keys = [k for k in available_keys if not k.name.startswith('~$')]
-            print(f"  Available key files: {[k.name for k in available_keys]}")
-        else:
-            print(f"  ERROR: Key directory does not exist: {KEY_DIR}")
+        logger.warning("No matching key file found for %s in %s", pdf_name, KEY_DIR)
     
     # Calculate score if key is available
     score_data = None
     if key_found:
-        print(f"Calculating score for {len(answers)} user answers against {len(answer_key)} answer key entries...")
         score_data = calculate_score(answers, answer_key, questions)
-        print(f"[OK] Score calculated: {score_data['correct']}/{score_data['total']} correct ({score_data['score_percentage']}%)")
+        logger.info("Score calculated: %d/%d correct (%s%%)",
+                    score_data['correct'], score_data['total'], score_data['score_percentage'])
     else:
-        print("[WARN] Cannot calculate score: No answer key available")
+        logger.warning("Cannot calculate score: No answer key available")
     
     # Create answer file name based on PDF name
     pdf_stem = Path(pdf_name).stem
     answer_filename = f"{pdf_stem}_answers.html"
     answer_path = ANSWER_DIR / answer_filename
     
-    # Generate HTML content with scores
-    html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Test Results: {pdf_name}</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            max-width: 900px;
-            margin: 40px auto;
-            padding: 20px;
-            background: #f5f5f5;
-        }}
-        .container {{
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #333;
-            margin-bottom: 10px;
-        }}
-        .pdf-name {{
-            color: #666;
-            margin-bottom: 30px;
-        }}
-        .score-summary {{
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 25px;
-            border-radius: 8px;
-            margin-bottom: 30px;
-            text-align: center;
-        }}
-        .score-summary h2 {{
-            margin: 0 0 15px 0;
-            font-size: 24px;
-        }}
-        .score-details {{
-            display: flex;
-            justify-content: space-around;
-            margin-top: 20px;
-        }}
-        .score-item {{
-            text-align: center;
-        }}
-        .score-item .number {{
-            font-size: 32px;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }}
-        .score-item .label {{
-            font-size: 14px;
-            opacity: 0.9;
-        }}
-        .answer-item {{
-            margin-bottom: 20px;
-            padding: 15px;
-            background: #f8f9fa;
-            border-radius: 5px;
-            border-left: 4px solid #667eea;
-        }}
-        .answer-item.correct {{
-            border-left-color: #28a745;
-            background: #d4edda;
-        }}
-        .answer-item.incorrect {{
-            border-left-color: #dc3545;
-            background: #f8d7da;
-        }}
-        .answer-item.unanswered {{
-            border-left-color: #ffc107;
-            background: #fff3cd;
-        }}
-        .question-number {{
-            font-weight: 700;
-            color: #667eea;
-            margin-bottom: 5px;
-        }}
-        .answer-item.correct .question-number {{
-            color: #28a745;
-        }}
-        .answer-item.incorrect .question-number {{
-            color: #dc3545;
-        }}
-        .answer-text {{
-            color: #333;
-            margin-left: 20px;
-            margin-top: 5px;
-        }}
-        .correct-answer {{
-            color: #28a745;
-            font-weight: 600;
-            margin-top: 5px;
-            margin-left: 20px;
-        }}
-        .status-badge {{
-            display: inline-block;
-            padding: 4px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-            font-weight: 600;
-            margin-left: 10px;
-        }}
-        .status-correct {{
-            background: #28a745;
-            color: white;
-        }}
-        .status-incorrect {{
-            background: #dc3545;
-            color: white;
-        }}
-        .status-unanswered {{
-            background: #ffc107;
-            color: #333;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Test Results</h1>
-        <p class="pdf-name">PDF: {pdf_name}</p>
-"""
-    
-    # Add score summary if available
+    # Collect wrong and unanswered questions for the summary sections
+    wrong_questions = []
+    unanswered_list = []
     if score_data:
-        html_content += f"""
-        <div class="score-summary">
-            <h2>Your Score: {score_data['score_percentage']}%</h2>
-            <div class="score-details">
-                <div class="score-item">
-                    <div class="number">{score_data['correct']}</div>
-                    <div class="label">Correct</div>
-                </div>
-                <div class="score-item">
-                    <div class="number">{score_data['incorrect']}</div>
-                    <div class="label">Incorrect</div>
-                </div>
-                <div class="score-item">
-                    <div class="number">{score_data['unanswered']}</div>
-                    <div class="label">Unanswered</div>
-                </div>
-                <div class="score-item">
-                    <div class="number">{score_data['total']}</div>
-                    <div class="label">Total</div>
-                </div>
-            </div>
-        </div>
-"""
-    elif key_path:
-        html_content += """
-        <div style="background: #fff3cd; padding: 15px; border-radius: 8px; margin-bottom: 20px; color: #856404;">
-            <strong>Note:</strong> Answer key file found but could not extract answers. Please check the key file format.
-        </div>
-"""
-    else:
-        html_content += """
-        <div style="background: #d1ecf1; padding: 15px; border-radius: 8px; margin-bottom: 20px; color: #0c5460;">
-            <strong>Note:</strong> No answer key file found. Answers saved but not scored.
-        </div>
-"""
-    
-    # Add wrong answers section if there are incorrect answers
-    if score_data:
-        wrong_questions = []
+        wrong_items = []
         unanswered_questions = []
         for q_num, result in score_data['results'].items():
             if result.get('status') == 'incorrect':
-                wrong_questions.append({
+                wrong_items.append({
                     'number': q_num,
                     'user_answer': result.get('user_answer', ''),
                     'correct_answer': result.get('correct_answer', '')
@@ -1390,163 +1317,78 @@ async def submit_answers(pdf_name: str, request: Request):
                     'correct_answer': result.get('correct_answer', '')
                 })
         
-        if wrong_questions:
-            html_content += """
-        <div class="wrong-answers-section" style="margin-bottom: 30px;">
-            <h2 style="color: #dc3545; margin-bottom: 20px; border-bottom: 2px solid #dc3545; padding-bottom: 10px;">
-                Incorrect Answers ({count})
-            </h2>
-            <table style="width: 100%; border-collapse: collapse;">
-                <thead>
-                    <tr style="background: #f8d7da; color: #721c24;">
-                        <th style="padding: 12px; text-align: left; border: 1px solid #f5c6cb;">Question #</th>
-                        <th style="padding: 12px; text-align: left; border: 1px solid #f5c6cb;">Your Answer</th>
-                        <th style="padding: 12px; text-align: left; border: 1px solid #f5c6cb;">Correct Answer</th>
-                    </tr>
-                </thead>
-                <tbody>
-""".replace('{count}', str(len(wrong_questions)))
-            
-            # Format answer helper function
-            def format_answer_display(q_num: int, ans: str) -> str:
-                """Format answer as '3. B.' format"""
-                if ans and ans.strip():
-                    ans_letter = ans.strip().upper()
-                    if len(ans_letter) == 1 and ans_letter in ['A', 'B', 'C', 'D', 'E']:
-                        return f"{q_num}. {ans_letter}."
-                    else:
-                        letter_match = re.search(r'([A-E])', ans_letter)
-                        if letter_match:
-                            return f"{q_num}. {letter_match.group(1)}."
-                return f"{q_num}. {ans}" if ans else f"{q_num}. (No answer)"
-            
-            for wrong in sorted(wrong_questions, key=lambda x: x['number']):
-                formatted_user = format_answer_display(wrong['number'], wrong['user_answer'])
-                formatted_correct = format_answer_display(wrong['number'], wrong['correct_answer'])
-                html_content += f"""
-                    <tr style="background: #fff; border-bottom: 1px solid #f5c6cb;">
-                        <td style="padding: 10px; border: 1px solid #f5c6cb; font-weight: 600; color: #dc3545;">{wrong['number']}</td>
-                        <td style="padding: 10px; border: 1px solid #f5c6cb; color: #721c24;">{formatted_user}</td>
-                        <td style="padding: 10px; border: 1px solid #f5c6cb; color: #28a745; font-weight: 600;">{formatted_correct}</td>
-                    </tr>
-"""
-            
-            html_content += """
-                </tbody>
-            </table>
-        </div>
-"""
+        for wrong in sorted(wrong_items, key=lambda x: x['number']):
+            q_num = wrong['number']
+            wrong_questions.append((
+                q_num,
+                format_answer(q_num, wrong['user_answer']) if wrong['user_answer'] else f"{q_num}. (No answer)",
+                format_answer(q_num, wrong['correct_answer']) if wrong['correct_answer'] else f"{q_num}. (No answer)",
+            ))
         
-        if unanswered_questions:
-            # Format unanswered questions with correct answers
-            unanswered_list = []
-            for q in sorted(unanswered_questions, key=lambda x: x['number']):
-                q_num = q['number']
-                correct_ans = q.get('correct_answer', '')
-                if correct_ans and correct_ans not in ["Unknown", ""]:
-                    # Format as "3. B."
-                    ans_letter = correct_ans.strip().upper()
-                    if len(ans_letter) == 1 and ans_letter in ['A', 'B', 'C', 'D', 'E']:
-                        formatted = f"{q_num}. {ans_letter}."
-                    else:
-                        letter_match = re.search(r'([A-E])', ans_letter)
-                        formatted = f"{q_num}. {letter_match.group(1)}." if letter_match else f"{q_num}. {correct_ans}"
-                    unanswered_list.append(f"Q{q_num}: {formatted}")
-                else:
-                    unanswered_list.append(f"Q{q_num}")
-            
-            html_content += f"""
-        <div class="unanswered-section" style="margin-bottom: 30px;">
-            <h3 style="color: #ffc107; margin-bottom: 15px;">Unanswered Questions ({len(unanswered_questions)})</h3>
-            <div style="color: #856404; line-height: 1.8;">
-                {'<br>'.join(unanswered_list)}
-            </div>
-        </div>
-"""
-    
-    html_content += """
-        <div class="answers">
-            <h2 style="color: #333; margin-bottom: 20px; border-bottom: 2px solid #667eea; padding-bottom: 10px;">
-                All Answers
-            </h2>
-"""
+        # Format unanswered questions with correct answers
+        for q in sorted(unanswered_questions, key=lambda x: x['number']):
+            q_num = q['number']
+            correct_ans = q.get('correct_answer', '')
+            if correct_ans and correct_ans not in ["Unknown", ""]:
+                # Format as "3. B."
+                unanswered_list.append(f"Q{q_num}: {format_answer(q_num, correct_ans)}")
+            else:
+                unanswered_list.append(f"Q{q_num}")
     
     # Sort answers by question number
-    sorted_answers = sorted(answers.items(), key=lambda x: int(x[0]) if x[0].isdigit() else 0)
-    
-    # Format answer for display: "3 B" -> "3. B."
-    def format_answer(question_num: str, answer: str) -> str:
-        """Format answer as '3. B.' format"""
-        if answer and answer.strip():
-            # Extract just the letter if it's a full answer
-            answer_letter = answer.strip().upper()
-            if len(answer_letter) == 1 and answer_letter in ['A', 'B', 'C', 'D', 'E']:
-                return f"{question_num}. {answer_letter}."
-            else:
-                # Try to extract letter from answer
-                letter_match = re.search(r'([A-E])', answer_letter)
-                if letter_match:
-                    return f"{question_num}. {letter_match.group(1)}."
-        return f"{question_num}. {answer}"
-    
-    for question_num, answer in sorted_answers:
-        q_num = int(question_num) if question_num.isdigit() else 0
-        result = score_data['results'].get(q_num, {}) if score_data else {}
+    numbered_answers = []
+    for question_num, answer in answers.items():
+        try:
+            q_num = int(question_num)
+        except ValueError:
+            q_num = 0
+        numbered_answers.append((q_num, question_num, answer))
+    numbered_answers.sort(key=lambda x: x[0])
+    
+    answer_rows = []
+    results_map = score_data['results'] if score_data else {}
+    for q_num, question_num, answer in numbered_answers:
+        result = results_map.get(q_num, {})
         status = result.get('status', 'no_key')
         correct_answer = result.get('correct_answer', '')
         
         # Format answers for display
-        formatted_user_answer = format_answer(question_num, answer)
         formatted_correct_answer = ""
         if correct_answer and correct_answer not in ["No key available", "Unknown", ""]:
             formatted_correct_answer = format_answer(question_num, correct_answer)
         
-        status_class = status if status in ['correct', 'incorrect', 'unanswered'] else ''
-        status_label = {
-            'correct': '✓ Correct',
-            'incorrect': '✗ Incorrect',
-            'unanswered': '? Unanswered',
-            'no_key': ''
-        }.get(status, '')
-        
-        html_content += f"""
-            <div class="answer-item {status_class}">
-                <div class="question-number">
-                    Question {question_num}
-                    {f'<span class="status-badge status-{status}">{status_label}</span>' if status_label else ''}
-                </div>
-                <div class="answer-text"><strong>Your Answer:</strong> {formatted_user_answer}</div>
-"""
-        if formatted_correct_answer:
-            html_content += f"""
-                <div class="correct-answer"><strong>Correct Answer:</strong> {formatted_correct_answer}</div>
-"""
-        html_content += """
-            </div>
-"""
-    
-    html_content += """
-        </div>
-    </div>
-</body>
-</html>
-"""
+        answer_rows.append({
+            "question_num": question_num,
+            "status": status,
+            "status_class": status if status in _STATUS_CLASSES else '',
+            "status_label": _STATUS_LABELS.get(status, ''),
+            "user_answer": format_answer(question_num, answer),
+            "correct_answer": formatted_correct_answer,
+        })
     
-    # Save HTML file
+    # Render and write the results page off the event loop
     try:
-        with open(answer_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        await asyncio.to_thread(
+            _write_results_page,
+            answer_path,
+            pdf_name=pdf_name,
+            score_data=score_data,
+            key_file_found=bool(key_path),
+            wrong_questions=wrong_questions,
+            unanswered_questions=unanswered_list,
+            answers=answer_rows,
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
     
-    return templates.TemplateResponse("success.html", {
-        "request": request,
-        "pdf_name": pdf_name,
-        "answer_file": answer_filename,
-        "answer_path": str(answer_path),
-        "score_data": score_data,
-        "key_found": key_found
-    })
+    return HTMLResponse(_template("success.html").render(
+        request=request,
+        pdf_name=pdf_name,
+        answer_file=answer_filename,
+        answer_path=str(answer_path),
+        score_data=score_data,
+        key_found=key_found
+    ))
 
 
 if __name__ == "__main__":
@@ -1565,8 +1407,18 @@ if __name__ == "__main__":
     print("=" * 50)
     print()
     
+    # C event loop and HTTP parser when installed (uvloop is not available on Windows)
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    # A single worker by default: this is a local single-user server, and every
+    # extra worker runs its own cache warm-up and keeps its own parse caches.
+    # Set WEB_CONCURRENCY to opt in to more worker processes
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    
     try:
-        uvicorn.run(app, host="127.0.0.1", port=8000, log_level="info")
+        # Multiple workers need the app as an import string
+        uvicorn.run("test_ui_app:app", app_dir=str(Path(__file__).parent), host="127.0.0.1", port=8000,
+                    log_level="info", loop=loop, http=http, workers=workers)
     except KeyboardInterrupt:
         print("\nServer stopped by user")
         sys.exit(0)